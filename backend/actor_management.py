@@ -1,20 +1,71 @@
 import sqlite3
 import os
+import threading
+import weakref
 
 # Assuming the database is in the 'database' directory relative to the project root.
 # For testing, this script might be run from /app, so db_path needs to be correct.
 DATABASE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database')
 DEFAULT_DB_PATH = os.path.join(DATABASE_DIR, 'video_management.db')
+# Names per IN (...) lookup query, below SQLite's default bound-parameter limit of older versions (999)
+MAX_LOOKUP_VARIABLES = 500
+
+# Connections are opened once per (thread, db_path) and reused across calls, instead of a new
+# connection (and PRAGMA setup) for every lookup. sqlite3 connections must not be shared
+# between threads, so each thread keeps its own in thread-local storage: they are dropped
+# (and closed) when the thread exits, and a new thread never inherits an old thread's
+# connection. check_same_thread=False only so close_connections() can close them.
+_thread_state = threading.local()
+# Every live thread's connection cache, for close_connections(). Weak, so it doesn't keep
+# the caches of exited threads alive.
+_connection_caches = weakref.WeakSet()
+_connection_caches_lock = threading.Lock()
+
+class _ThreadConnections:
+    """One thread's cached connections; a small object so the registry can reference it weakly."""
+    __slots__ = ("by_path", "__weakref__")
+
+    def __init__(self):
+        self.by_path = {} # db_path -> sqlite3.Connection
 
 def _get_db_connection(db_path):
-    """Helper function to get a database connection."""
-    if not os.path.exists(os.path.dirname(db_path)):
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row # Access columns by name
-    conn.execute("PRAGMA foreign_keys = ON;") # Ensure foreign key constraints are enforced
+    """
+    Helper function to get this thread's cached database connection. Callers use it as
+    'with conn:', which commits or rolls back but leaves the connection open for reuse.
+    """
+    cache = getattr(_thread_state, "connections", None)
+    if cache is None:
+        cache = _thread_state.connections = _ThreadConnections()
+        with _connection_caches_lock:
+            _connection_caches.add(cache)
+    conn = cache.by_path.get(db_path)
+    if conn is None:
+        if not os.path.exists(os.path.dirname(db_path)):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row # Access columns by name
+        conn.execute("PRAGMA foreign_keys = ON;") # Ensure foreign key constraints are enforced
+        # The connection lives as long as its thread, so a larger page cache keeps the actors
+        # and aliases tables and their indexes in memory across lookups
+        conn.execute("PRAGMA cache_size = -20000;") # 20 MB page cache
+        cache.by_path[db_path] = conn
     return conn
 
+def close_connections():
+    """
+    Closes every cached connection of every live thread, e.g. at shutdown or before deleting
+    a database file. For shutdown only: call it once worker threads have stopped using this
+    module, since it also closes connections another thread may be in the middle of using.
+    Connections are opened again on the next call.
+    """
+    with _connection_caches_lock:
+        caches = list(_connection_caches)
+    for cache in caches:
+        connections = list(cache.by_path.values())
+        cache.by_path.clear()
+        for conn in connections:
+            conn.close()
+
 def add_actor(db_path, actor_name):
     """
     Adds a new actor to the actors table.
@@ -128,6 +179,37 @@ def get_actor_id_by_name_or_alias(db_path, name):
         print(f"Database error while searching for '{name}': {e}")
         return None
 
+def get_actor_ids_by_names_or_aliases(db_path, names):
+    """
+    Looks up several names at once, like get_actor_id_by_name_or_alias but with a single
+    connection and one query per table instead of up to two queries per name.
+    A match in the actors table takes precedence over an alias match.
+    Returns a dict mapping each given name to its actor_id, or to None if there is no match.
+    """
+    actor_ids = {name: None for name in names}
+    pending = [name for name in actor_ids if name]
+    if not pending:
+        return actor_ids
+
+    try:
+        with _get_db_connection(db_path) as conn:
+            cursor = conn.cursor()
+            for table_sql in ("SELECT name, id FROM actors WHERE name IN ({})",
+                              "SELECT alias_name, actor_id FROM actor_aliases WHERE alias_name IN ({})"):
+                for start in range(0, len(pending), MAX_LOOKUP_VARIABLES):
+                    chunk = pending[start:start + MAX_LOOKUP_VARIABLES]
+                    cursor.execute(table_sql.format(",".join("?" * len(chunk))), chunk)
+                    for found_name, actor_id in cursor.fetchall():
+                        actor_ids[found_name] = actor_id
+                # Only names without an actor match are looked up as aliases
+                pending = [name for name in pending if actor_ids[name] is None]
+                if not pending:
+                    break
+            return actor_ids
+    except sqlite3.Error as e:
+        print(f"Database error while searching for {len(actor_ids)} names: {e}")
+        return dict.fromkeys(actor_ids) # names may be a one-shot iterable
+
 def get_aliases_for_actor(db_path, actor_id):
     """
     Retrieves all aliases associated with the given actor_id.
@@ -167,6 +249,29 @@ def get_actor_name_by_id(db_path, actor_id):
         print(f"Database error while fetching name for actor ID {actor_id}: {e}")
         return None
 
+def get_actor_names_by_ids(db_path, actor_ids):
+    """
+    Retrieves the main names of several actors at once, like get_actor_name_by_id but with
+    a single connection and one query (per MAX_LOOKUP_VARIABLES IDs).
+    Returns a dict mapping each found actor_id to its name; unknown IDs are left out.
+    """
+    pending = list(dict.fromkeys(actor_id for actor_id in actor_ids if actor_id is not None))
+    if not pending:
+        return {}
+
+    try:
+        with _get_db_connection(db_path) as conn:
+            cursor = conn.cursor()
+            names = {}
+            for start in range(0, len(pending), MAX_LOOKUP_VARIABLES):
+                chunk = pending[start:start + MAX_LOOKUP_VARIABLES]
+                cursor.execute(f"SELECT id, name FROM actors WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+                names.update(cursor.fetchall())
+            return names
+    except sqlite3.Error as e:
+        print(f"Database error while fetching names for {len(pending)} actor IDs: {e}")
+        return {}
+
 if __name__ == '__main__':
     print(f"Using database: {DEFAULT_DB_PATH}")
     if not os.path.exists(DEFAULT_DB_PATH):
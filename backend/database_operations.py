@@ -1,85 +1,434 @@
+import logging
 import sqlite3
 import os
+import threading
+import weakref
+from contextlib import contextmanager
 
-def _get_db_connection(db_path):
-    """Helper function to get a database connection."""
-    if not os.path.exists(os.path.dirname(db_path)):
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    conn = sqlite3.connect(db_path)
-    # Using sqlite3.Row to access columns by name is good for SELECTs,
-    # but not strictly necessary for INSERT/UPDATE if we don't fetch results immediately by name.
-    # conn.row_factory = sqlite3.Row
+logger = logging.getLogger(__name__)
+
+# SQLite serializes writers anyway, so writes in this process go through a single lock
+# instead of contending inside SQLite.
+_writer_lock = threading.RLock() # Reentrant so write transactions can nest (see _write_transaction)
+_journal_mode_logged = set() # db_paths whose journal mode has been reported
+_ensured_dirs = set() # Database directories already created/checked in this process
+_checked_filepath_index = set() # db_paths whose videos.filepath unique index has been verified
+_duplicate_filepaths_logged = set() # db_paths whose duplicate filepaths have been reported
+# Actor IDs known to exist, per db_path. Loaded lazily and only ever grown with IDs confirmed
+# in the database, so phantom IDs are rejected without an insert attempt. Guarded by _writer_lock.
+_known_actor_ids = {} # db_path -> set of actor ids
+# Writer connections are opened once per (thread, db_path) and reused, keeping SQLite's page
+# cache warm across calls. sqlite3 connections must not be shared between threads, so each
+# thread keeps its own in thread-local storage: they are dropped (and closed) when the thread
+# exits, and a new thread never inherits an old thread's connection. check_same_thread=False
+# only so close_all() can close them.
+_thread_state = threading.local()
+# Every live thread's writer cache, for close_all(). Weak, so it doesn't keep the caches of
+# exited threads alive.
+_writer_caches = weakref.WeakSet()
+_writer_connections_lock = threading.Lock() # Guards the caches against close_all()
+
+class _ThreadWriters:
+    """One thread's cached writer connections; a small object so the registry can reference it weakly."""
+    __slots__ = ("by_path", "__weakref__")
+
+    def __init__(self):
+        self.by_path = {} # db_path -> sqlite3.Connection
+
+# The sqlite3 module caches prepared statements per connection, keyed by SQL text. Since the
+# writer connection is long-lived, hot statements are compiled once and then only re-bound;
+# a larger cache keeps them from being evicted by one-off queries.
+STATEMENT_CACHE_SIZE = 256
+
+# Statements used on every update_video_record call
+_SQL_UPSERT_VIDEO = """
+    INSERT INTO videos (filepath, code, title, publisher, duration_seconds, standardized_filename)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(filepath) DO UPDATE SET
+        code=excluded.code, title=excluded.title, publisher=excluded.publisher,
+        duration_seconds=excluded.duration_seconds, standardized_filename=excluded.standardized_filename
+    RETURNING id
+"""
+_SQL_SELECT_VIDEO = """
+    SELECT id, filepath, code, title, publisher, duration_seconds, standardized_filename
+    FROM videos WHERE filepath=?
+"""
+_SQL_SELECT_VIDEO_ACTOR_IDS = "SELECT actor_id FROM video_actors WHERE video_id=?"
+_SQL_DELETE_VIDEO_ACTOR = "DELETE FROM video_actors WHERE video_id=? AND actor_id=?"
+_SQL_INSERT_VIDEO_ACTOR = "INSERT OR IGNORE INTO video_actors (video_id, actor_id) SELECT ?, id FROM actors WHERE id = ?"
+
+def _apply_connection_pragmas(conn):
+    """Per-connection tuning for writer connections."""
+    conn.execute("PRAGMA busy_timeout = 5000;") # Let SQLite retry a locked database for up to 5s
+    conn.execute("PRAGMA temp_store = MEMORY;")
+    conn.execute("PRAGMA cache_size = -20000;") # 20 MB page cache
+    conn.execute("PRAGMA mmap_size = 268435456;") # 256 MB memory-mapped reads
+
+def _open_writer_connection(db_path):
+    """Opens and configures a new read-write connection for db_path."""
+    db_dir = os.path.dirname(db_path)
+    if db_dir and db_dir not in _ensured_dirs:
+        os.makedirs(db_dir, exist_ok=True) # exist_ok makes a separate exists() check redundant
+        _ensured_dirs.add(db_dir)
+    # isolation_level=None: no implicit BEGIN from the sqlite3 module, callers issue
+    # BEGIN IMMEDIATE / COMMIT themselves.
+    conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False,
+                           cached_statements=STATEMENT_CACHE_SIZE)
+    try:
+        _configure_writer_connection(conn, db_path)
+    except sqlite3.Error:
+        conn.close() # Not cached, so close it here rather than leaving it to the GC
+        raise
+    return conn
+
+def _configure_writer_connection(conn, db_path):
+    """Applies the PRAGMAs and schema checks for a new writer connection."""
     conn.execute("PRAGMA foreign_keys = ON;") # Ensure foreign key constraints are enforced
+    _apply_connection_pragmas(conn)
+    if db_path != ":memory:":
+        # WAL: commits append to the log instead of rewriting a rollback journal, and
+        # readers keep working while a write is in progress. The mode persists in the file.
+        journal_mode = conn.execute("PRAGMA journal_mode = WAL;").fetchone()[0]
+        if db_path not in _journal_mode_logged:
+            _journal_mode_logged.add(db_path)
+            if journal_mode.lower() == "wal":
+                logger.info("Database '%s' using journal_mode=%s", db_path, journal_mode)
+            else: # e.g. network filesystems that cannot provide WAL's shared memory
+                logger.warning("Database '%s' could not switch to WAL, using journal_mode=%s", db_path, journal_mode)
+        if journal_mode.lower() == "wal":
+            # In WAL mode NORMAL is still corruption-safe; it only skips the fsync on each commit.
+            conn.execute("PRAGMA synchronous = NORMAL;")
+    _ensure_filepath_unique_index(conn, db_path)
+    try:
+        # Recommended for long-lived connections: analyze tables whose statistics are missing
+        # or stale, with a work limit so opening stays cheap. close_all() runs it again.
+        conn.execute("PRAGMA optimize = 0x10002;")
+    except sqlite3.Error as e:
+        logger.warning("PRAGMA optimize failed while opening connection: %s", e)
+
+def _ensure_filepath_unique_index(conn, db_path):
+    """
+    Makes sure videos.filepath is backed by a unique index, once per db_path.
+    The ON CONFLICT(filepath) upsert needs one as its conflict target, and it makes the
+    conflict check a single index seek. database_setup.py declares filepath UNIQUE, so
+    this only creates an index for databases built from an older or hand-made schema.
+    """
+    if db_path in _checked_filepath_index:
+        return
+    for index in conn.execute("PRAGMA index_list(videos);").fetchall():
+        # index_list rows: (seq, name, unique, origin, partial)
+        if index[2] and not index[4]:
+            columns = [row[0] for row in conn.execute(
+                "SELECT name FROM pragma_index_info(?) ORDER BY seqno", (index[1],))]
+            if columns == ['filepath']:
+                break
+    else:
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='videos'").fetchone():
+            try:
+                conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_videos_filepath ON videos(filepath);")
+                logger.warning("Database '%s' had no unique index on videos.filepath, created idx_videos_filepath", db_path)
+            except sqlite3.IntegrityError:
+                # Writes can't proceed without the index; report the cause once, not on every write
+                if db_path not in _duplicate_filepaths_logged:
+                    _duplicate_filepaths_logged.add(db_path)
+                    logger.error("Database '%s' has duplicate videos.filepath values, so the unique index "
+                                 "cannot be created; remove the duplicate rows (dedupe) before writing", db_path)
+                raise
+        else:
+            return # Schema not created yet; check again on the next connection
+    _checked_filepath_index.add(db_path)
+
+def _get_writer_connection(db_path):
+    """Helper function to get this thread's cached read-write connection for update transactions."""
+    writers = getattr(_thread_state, "writers", None)
+    if writers is None:
+        writers = _thread_state.writers = _ThreadWriters()
+        with _writer_connections_lock:
+            _writer_caches.add(writers)
+    with _writer_connections_lock:
+        conn = writers.by_path.get(db_path)
+    if conn is None:
+        conn = _open_writer_connection(db_path)
+        with _writer_connections_lock:
+            writers.by_path[db_path] = conn
     return conn
 
+def close_all():
+    """
+    Closes every live thread's cached writer connection, e.g. at shutdown or before deleting
+    a database file. Waits for a write transaction in progress to finish first. Writers run
+    PRAGMA optimize first so the query planner statistics gathered during the session are
+    kept. Per-database caches (known actor IDs, verified indexes) are dropped too, as the
+    file may be replaced.
+    """
+    with _writer_lock:
+        with _writer_connections_lock:
+            writers = []
+            for cache in list(_writer_caches):
+                writers.extend(cache.by_path.values())
+                cache.by_path.clear()
+        for conn in writers:
+            try:
+                conn.execute("PRAGMA optimize;")
+            except sqlite3.Error as e:
+                logger.warning("PRAGMA optimize failed while closing connection: %s", e)
+            conn.close()
+    refresh_actor_cache()
+    _checked_filepath_index.clear()
+    _duplicate_filepaths_logged.clear()
+
+def refresh_actor_cache(db_path=None):
+    """
+    Forgets the known actor IDs for db_path (or for every database), so they are reloaded
+    on the next update. Call it after deleting actors outside this module; newly added
+    actors are picked up without a refresh.
+    """
+    with _writer_lock:
+        if db_path is None:
+            _known_actor_ids.clear()
+        else:
+            _known_actor_ids.pop(db_path, None)
+
+def _split_known_actor_ids(cursor, db_path, actor_ids):
+    """Splits actor_ids into (known, unknown) lists using the per-database ID cache."""
+    known_ids = _known_actor_ids.get(db_path)
+    if known_ids is None:
+        known_ids = {row[0] for row in cursor.execute("SELECT id FROM actors")}
+        _known_actor_ids[db_path] = known_ids
+    known, unknown = [], []
+    for actor_id in actor_ids:
+        if actor_id in known_ids:
+            known.append(actor_id)
+        elif cursor.execute("SELECT 1 FROM actors WHERE id=? LIMIT 1", (actor_id,)).fetchone():
+            known_ids.add(actor_id) # Added since the cache was loaded
+            known.append(actor_id)
+        else:
+            unknown.append(actor_id)
+    return known, unknown
+
+@contextmanager
+def _write_transaction(db_path):
+    """
+    Runs one write transaction on this thread's writer connection and yields its cursor.
+    Commits when the block completes, rolls back (and re-raises) if it fails.
+
+    BEGIN IMMEDIATE takes SQLite's write lock up-front instead of letting a deferred
+    transaction upgrade mid-way, which fails with SQLITE_BUSY under concurrent writers.
+    Contract: one writer at a time per process (_writer_lock), and each public write
+    function runs in exactly one transaction, i.e. a single WAL commit.
+
+    When called while this thread's writer is already in a transaction, the block runs
+    in a SAVEPOINT instead: a failure undoes only the block, and the outer transaction
+    decides when to commit. This lets callers batch many update_video_record calls
+    into one commit:
+
+        with _write_transaction(db_path):
+            for record in records:
+                update_video_record(db_path, ...)
+    """
+    with _writer_lock:
+        conn = _get_writer_connection(db_path)
+        cursor = conn.cursor()
+        if conn.in_transaction:
+            cursor.execute("SAVEPOINT nested_write")
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute("ROLLBACK TO SAVEPOINT nested_write")
+                cursor.execute("RELEASE SAVEPOINT nested_write")
+                raise
+            cursor.execute("RELEASE SAVEPOINT nested_write")
+            return
+
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            # Check foreign keys once at COMMIT instead of failing the statement that
+            # violated them; resets automatically when the transaction ends. A violation
+            # makes COMMIT raise, and the transaction is rolled back below.
+            cursor.execute("PRAGMA defer_foreign_keys = ON")
+            yield cursor
+            cursor.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback() # Discard the partial write, keep the connection reusable
+            raise
+
 def update_video_record(db_path, original_filepath, code, title, publisher, duration_seconds, standardized_filename, actors_list):
     """
     Inserts or updates a video record in the 'videos' table and manages actor associations.
     'actors_list' is a list of dicts, e.g., [{'id': actor_id, 'canonical_name': ...}]
+
+    Requires the UNIQUE constraint on videos.filepath (see database_setup.py): it is the
+    conflict target of the ON CONFLICT(filepath) upsert, and its index
+    (sqlite_autoindex_videos_1) makes the conflict check a single index seek.
+    Upsert with RETURNING needs SQLite 3.35 or newer.
     """
-    video_id = None
+    video_row = (original_filepath, code, title, publisher, duration_seconds, standardized_filename)
     try:
-        with _get_db_connection(db_path) as conn:
-            cursor = conn.cursor()
-            try:
-                cursor.execute("""
-                    INSERT INTO videos (filepath, code, title, publisher, duration_seconds, standardized_filename)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (original_filepath, code, title, publisher, duration_seconds, standardized_filename))
-                video_id = cursor.lastrowid
-                print(f"Inserted new video record for '{original_filepath}', Video ID: {video_id}")
-            except sqlite3.IntegrityError: # Likely UNIQUE constraint on filepath
-                print(f"Video record for '{original_filepath}' likely exists. Attempting update.")
-                cursor.execute("""
-                    UPDATE videos
-                    SET code=?, title=?, publisher=?, duration_seconds=?, standardized_filename=?
-                    WHERE filepath=?
-                """, (code, title, publisher, duration_seconds, standardized_filename, original_filepath))
-
-                # After an update, we need to fetch the video_id
-                cursor.execute("SELECT id FROM videos WHERE filepath=?", (original_filepath,))
-                video_id_row = cursor.fetchone()
-                if video_id_row:
-                    video_id = video_id_row[0]
-                    print(f"Updated video record for '{original_filepath}', Video ID: {video_id}")
-                else:
-                    # This should not happen if the IntegrityError was due to the filepath UNIQUE constraint
-                    print(f"CRITICAL Error: Could not find Video ID for '{original_filepath}' after supposed update.")
-                    return # Exit if we can't get video_id
-
-            if video_id is None:
-                print(f"Error: video_id is None for '{original_filepath}'. Cannot manage actor associations.")
-                return
+        with _write_transaction(db_path) as cursor:
+            # Rescans mostly find unchanged rows; an UPDATE with identical values would still
+            # rewrite the page, so compare first (one index seek on filepath) and skip it.
+            existing = cursor.execute(_SQL_SELECT_VIDEO, (original_filepath,)).fetchone()
+            if existing is not None and existing[1:] == video_row:
+                video_id = existing[0]
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Video record for '%s' unchanged, Video ID: %s", original_filepath, video_id)
+            else:
+                # One statement for both cases: ON CONFLICT turns the insert into an update of
+                # the existing row, and RETURNING yields its id without a follow-up SELECT.
+                cursor.execute(_SQL_UPSERT_VIDEO, video_row)
+                video_id = cursor.fetchone()[0]
+                logger.info("Inserted/updated video record for '%s', Video ID: %s", original_filepath, video_id)
 
             # Manage video-actor associations
-            # 1. Delete existing associations for this video_id
-            cursor.execute("DELETE FROM video_actors WHERE video_id=?", (video_id,))
+            actors_list = actors_list or [] # Tolerate None
+            # Flattened once into an immutable tuple of actor IDs; only actors without a
+            # database ID need a second look, and only when some were dropped.
+            actor_ids = tuple(actor['id'] for actor in actors_list if actor.get('id') is not None)
+            if len(actor_ids) < len(actors_list):
+                skipped_names = [actor.get('canonical_name', 'Unknown Name') for actor in actors_list if actor.get('id') is None]
+                logger.warning("Actors without a database ID, skipping association: %s", skipped_names)
+
+            # Only apply the difference to the stored links: a rescan that finds the same
+            # actors writes nothing to video_actors (and nothing to the WAL for it).
+            current_ids = {row[0] for row in cursor.execute(_SQL_SELECT_VIDEO_ACTOR_IDS, (video_id,))}
+            new_ids = set(actor_ids)
+            ids_to_remove = current_ids - new_ids
+            ids_to_add = new_ids - current_ids
+
+            actors_removed_count = 0
+            if ids_to_remove:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Removing actor associations %s for Video ID: %s", sorted(ids_to_remove), video_id)
+                cursor.executemany(_SQL_DELETE_VIDEO_ACTOR, [(video_id, actor_id) for actor_id in ids_to_remove])
+                actors_removed_count = len(ids_to_remove)
+
+            # A single executemany keeps the per-actor loop inside the sqlite3 C module.
+            # Unknown IDs were filtered out above; selecting the actor id from the actors
+            # table (instead of binding it directly) still turns an ID deleted since it was
+            # cached into a zero-row insert rather than an FK IntegrityError.
+            if ids_to_add:
+                ids_to_add, unknown_ids = _split_known_actor_ids(cursor, db_path, ids_to_add)
+                if unknown_ids:
+                    logger.warning("Actor IDs not in the database, skipping association for video ID %s: %s",
+                                   video_id, sorted(unknown_ids))
 
-            # 2. Insert new associations
             actors_added_count = 0
-            if actors_list: # Ensure actors_list is not None or empty
-                for actor in actors_list:
-                    actor_db_id = actor.get('id') # Get the actor's ID from the database
-                    if actor_db_id is not None:
-                        try:
-                            cursor.execute("INSERT INTO video_actors (video_id, actor_id) VALUES (?, ?)", (video_id, actor_db_id))
-                            actors_added_count += 1
-                        except sqlite3.IntegrityError as e:
-                            # This could happen if actor_id doesn't exist in actors table (FK constraint)
-                            # Or if the (video_id, actor_id) pair somehow violates PK (shouldn't after delete)
-                            print(f"Warning: Could not add association for video ID {video_id} and actor ID {actor_db_id}. Error: {e}")
-                    else:
-                        print(f"Warning: Actor '{actor.get('canonical_name', 'Unknown Name')}' does not have a database ID. Skipping association.")
-
-            conn.commit()
-            print(f"Successfully updated/inserted video and {actors_added_count} actor links for '{original_filepath}' (Video ID: {video_id})")
+            if ids_to_add:
+                cursor.executemany(_SQL_INSERT_VIDEO_ACTOR, [(video_id, actor_id) for actor_id in ids_to_add])
+                actors_added_count = cursor.rowcount
+                if actors_added_count < len(ids_to_add):
+                    # Reconcile once via rowcount instead of per-row errors: look up which
+                    # cached IDs are gone and drop them from the cache.
+                    placeholders = ",".join("?" * len(ids_to_add))
+                    present_ids = {row[0] for row in cursor.execute(
+                        f"SELECT id FROM actors WHERE id IN ({placeholders})", ids_to_add)}
+                    stale_ids = sorted(set(ids_to_add) - present_ids)
+                    _known_actor_ids[db_path].difference_update(stale_ids)
+                    logger.warning("Actor IDs deleted since cached, skipping association for video ID %s: %s",
+                                   video_id, stale_ids)
+
+        logger.info("Successfully updated/inserted video for '%s' (Video ID: %s): %d actor links added, %d removed",
+                    original_filepath, video_id, actors_added_count, actors_removed_count)
 
     except sqlite3.Error as e:
-        print(f"Database error in update_video_record for '{original_filepath}': {e}")
+        # Expected database failures (locks, constraints) log the message only; formatting a
+        # traceback is reserved for the unexpected-error fallback below.
+        logger.error("Database error in update_video_record for '%s': %s", original_filepath, e)
     except Exception as e:
-        print(f"An unexpected error occurred in update_video_record for '{original_filepath}': {e}")
+        logger.error("An unexpected error occurred in update_video_record for '%s': %s", original_filepath, e,
+                     exc_info=True)
+
+def bulk_update_video_records(db_path, video_records):
+    """
+    Inserts or updates many video records and their actor associations in one transaction.
+    'video_records' is an iterable of dicts shaped like process_video_file's consolidated
+    metadata: 'filepath', 'code', 'title', 'publisher', 'duration_seconds',
+    'standardized_filename' and 'actors' (list of {'id': actor_id, ...}).
+
+    Rows are staged into temp tables with executemany and merged with a fixed number of
+    set-based statements, so the statement count doesn't grow with the batch size.
+    Each video ends up linked to exactly its listed actors, as in update_video_record; if a filepath
+    appears more than once, the last record wins. Unknown actor IDs are skipped.
+    Returns the number of video records written (0 on error).
+    """
+    staged = {} # filepath -> (video row, actor ids); dict keeps last-wins semantics
+    for record in video_records:
+        filepath = record['filepath']
+        video_row = (filepath, record.get('code'), record.get('title'), record.get('publisher'),
+                     record.get('duration_seconds'), record.get('standardized_filename'))
+        actor_ids = tuple(actor['id'] for actor in record.get('actors') or () if actor.get('id') is not None)
+        staged[filepath] = (video_row, actor_ids)
+    if not staged:
+        return 0
+
+    video_rows = [video_row for video_row, _ in staged.values()]
+    actor_rows = tuple((filepath, actor_id) for filepath, (_, actor_ids) in staged.items() for actor_id in actor_ids)
+    try:
+        with _write_transaction(db_path) as cursor:
+            # Temp tables live in the connection's temp schema; the writer connection is
+            # cached, so they are created once and emptied after each batch.
+            cursor.execute("""CREATE TEMP TABLE IF NOT EXISTS _stage_videos (
+                                filepath TEXT PRIMARY KEY, code TEXT, title TEXT, publisher TEXT,
+                                duration_seconds INTEGER, standardized_filename TEXT)""")
+            cursor.execute("""CREATE TEMP TABLE IF NOT EXISTS _stage_video_actors (
+                                filepath TEXT, actor_id INTEGER, PRIMARY KEY (filepath, actor_id))""")
+            cursor.executemany("INSERT INTO _stage_videos VALUES (?, ?, ?, ?, ?, ?)", video_rows)
+            cursor.executemany("INSERT OR IGNORE INTO _stage_video_actors VALUES (?, ?)", actor_rows)
+
+            # 'WHERE true' disambiguates the ON CONFLICT clause from a join constraint
+            cursor.execute("""
+                INSERT INTO videos (filepath, code, title, publisher, duration_seconds, standardized_filename)
+                SELECT filepath, code, title, publisher, duration_seconds, standardized_filename
+                FROM _stage_videos WHERE true
+                ON CONFLICT(filepath) DO UPDATE SET
+                    code=excluded.code, title=excluded.title, publisher=excluded.publisher,
+                    duration_seconds=excluded.duration_seconds, standardized_filename=excluded.standardized_filename
+            """)
+            # Links are reconciled rather than reset: only links missing from the staged set
+            # are deleted, and links that already exist are ignored by the insert, so
+            # unchanged associations are never rewritten.
+            cursor.execute("""
+                DELETE FROM video_actors
+                WHERE video_id IN (SELECT v.id FROM videos v JOIN _stage_videos s ON v.filepath = s.filepath)
+                  AND NOT EXISTS (SELECT 1 FROM _stage_video_actors s JOIN videos v ON v.filepath = s.filepath
+                                  WHERE v.id = video_actors.video_id AND s.actor_id = video_actors.actor_id)
+            """)
+            actors_removed_count = cursor.rowcount
+            cursor.execute("""
+                INSERT OR IGNORE INTO video_actors (video_id, actor_id)
+                SELECT v.id, a.id
+                FROM _stage_video_actors s
+                JOIN videos v ON v.filepath = s.filepath
+                JOIN actors a ON a.id = s.actor_id
+            """)
+            actors_added_count = cursor.rowcount
+            unknown_ids = [row[0] for row in cursor.execute("""
+                SELECT DISTINCT s.actor_id FROM _stage_video_actors s
+                WHERE NOT EXISTS (SELECT 1 FROM actors a WHERE a.id = s.actor_id)
+                ORDER BY s.actor_id
+            """)]
+            if unknown_ids:
+                logger.warning("Actor IDs not in the database, skipped in bulk update: %s", unknown_ids)
+
+            cursor.execute("DELETE FROM _stage_videos")
+            cursor.execute("DELETE FROM _stage_video_actors")
+
+        logger.info("Bulk updated/inserted %d video records: %d actor links added, %d removed",
+                    len(video_rows), actors_added_count, actors_removed_count)
+        return len(video_rows)
+
+    except sqlite3.Error as e:
+        logger.error("Database error in bulk_update_video_records (%d records): %s", len(video_rows), e)
+    except Exception as e:
+        logger.error("An unexpected error occurred in bulk_update_video_records (%d records): %s", len(video_rows), e,
+                     exc_info=True)
+    return 0
 
 if __name__ == '__main__':
+    # Library code only logs; configure output when run directly.
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
     # Basic test (requires database_setup.py to have run)
     # Construct path to DB, assuming this script is in backend/
     db_dir_for_test = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database')
@@ -131,8 +480,10 @@ if __name__ == '__main__':
 
         print("\n--- Verifying Data (Manual Check Recommended) ---")
         # Simple verification
+        conn = None
         try:
-            conn = _get_db_connection(test_db_path)
+            conn = sqlite3.connect(test_db_path)
+            conn.row_factory = sqlite3.Row # For dict(row) below
             cursor = conn.cursor()
             print("\nVideos table:")
             for row in cursor.execute("SELECT id, filepath, standardized_filename, title FROM videos ORDER BY id DESC LIMIT 5"):
@@ -144,6 +495,9 @@ if __name__ == '__main__':
             if v_id_row:
                 for row in cursor.execute("SELECT video_id, actor_id FROM video_actors WHERE video_id = ?", (v_id_row[0],)):
                     print(dict(row))
-            conn.close()
         except Exception as e:
             print(f"Error during verification: {e}")
+        finally:
+            if conn:
+                conn.close()
+            close_all()
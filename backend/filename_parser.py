@@ -1,4 +1,220 @@
+import collections
+import functools
 import re
+import sys
+
+# Patterns are compiled once at import instead of going through the re module's
+# pattern cache on every call; parse_filename runs once per file in a directory scan.
+
+# Regex for code:
+# Pattern 1: [ANYTHING-REASONABLE-IN-BRACKETS] (e.g., [ABC-123], [XYZ_007], [CODE789])
+CODE_PATTERN_BRACKETS = re.compile(r"\[([\w.-]+)\]") # Allows word chars, dots, hyphens within brackets
+# Pattern 2: COMPANY-CODE or COMPANY_CODE (e.g., XYZ-007, Publisher_CODE)
+# Requires a structure like WORD-DIGITS or WORD_DIGITS. At least one digit is required.
+# Allows for multiple words before the hyphen/underscore e.g. LONG_COMPANY_NAME-123
+# Removed \b at the end as it prevented matching if code was followed by underscore.
+CODE_PATTERN_NO_BRACKETS = re.compile(r"((?:[A-Z][A-Za-z0-9]*_)*[A-Z][A-Za-z0-9]*[-_][A-Za-z0-9]*\d[A-Za-z0-9]*)")
+# Both code patterns in one alternation, so a filename without any code is scanned once.
+# Group 1 is the bracketed code, group 2 the plain one.
+CODE_PATTERN = re.compile(f"{CODE_PATTERN_BRACKETS.pattern}|{CODE_PATTERN_NO_BRACKETS.pattern}")
+# Common series/episode markers at the end of a code candidate (e.g., _ep01, -part2),
+# checked by _is_episode_code
+EPISODE_KEYWORDS = ("ep", "episode", "part", "vol", "chapter", "sc")
+
+# Regex for actors:
+# Pattern 1: " - Actor Name1, Actor Name2" or " - Actor Name1 & Actor Name2" or " - SingleActorName"
+# Looks for a hyphen separator, then capitalized words (potentially with spaces, underscores, or dots)
+# separated by common delimiters like ',', '&'.
+ACTOR_PATTERN_DASH_SEPARATOR = re.compile(r"\s-\s+((?:[A-Z][\w\s'.-]+?)(?:\s*[,&]\s*[A-Z][\w\s'.-]+?)*)$")
+ACTOR_NAME_DELIMITER_PATTERN = re.compile(r"\s*[,&]\s*")
+
+# Pattern 2: Underscore or space separated actors at the end of the string if no clear " - " separator.
+# Conservative on purpose: one or two capitalized words (or initials) at the very end, preceded by
+# a space or underscore, e.g. "_ActorName", " ActorName", "_ActorA_ActorB" or " ActorA ActorB".
+# Group 1 captures the whole actor string (e.g., "ActorA_ActorB" or "ActorName").
+ACTOR_PATTERN_SUFFIX_HEURISTIC = re.compile(r"[_\s](([A-Z][a-z']+|[A-Z])(?:[_\s]([A-Z][a-z']+|[A-Z]))?)$")
+# Whole candidates that are common filename suffixes rather than actors
+COMMON_NON_ACTOR_SUFFIXES = frozenset({'final', 'extended', 'uncut', 'remastered', 'official', 'trailer', 'movie',
+                                       'film', 'ost', 'soundtrack'})
+# Stop-words that can't be part of a name. Only multi-letter words: name parts are letters
+# and apostrophes, and single letters are always allowed as initials.
+COMMON_NON_ACTOR_WORDS = frozenset({'in', 'on', 'of', 'an', 'the', 'is', 'at', 'to', 'and', 'or', 'but', 'vs'})
+
+# ASCII characters that give a filename structure beyond a plain title (see _is_plain_title):
+# '[' and digits for codes, '_' and whitespace (as matched by \s) for actor separators
+STRUCTURE_CHARS_DELETE_TABLE = str.maketrans("", "", "[_0123456789 \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f")
+
+# Title cleanup
+TITLE_SEPARATOR_TABLE = str.maketrans("._", "  ") # Dots/underscores to spaces
+DOUBLE_DASH_PATTERN = re.compile(r"-\s*-")
+
+def _is_episode_code(code):
+    """
+    True if code ends with a series/episode marker followed by digits, e.g. "_ep01",
+    "-part2", ".Vol_3": a separator (_ . -), one of EPISODE_KEYWORDS (case-insensitive),
+    an optional separator, then digits. Plain string checks are enough for a handful of
+    literal keywords, no regex needed.
+    """
+    s = code.lower()
+    i = len(s)
+    while i and s[i - 1].isdigit():
+        i -= 1
+    if i == len(s): # No trailing digits
+        return False
+    if i and s[i - 1] in "_.-": # Optional separator between keyword and digits
+        i -= 1
+    head = s[:i]
+    for keyword in EPISODE_KEYWORDS:
+        # The keyword itself must be preceded by a separator
+        if head.endswith(keyword) and len(head) > len(keyword) and head[-len(keyword) - 1] in "_.-":
+            return True
+    return False
+
+def _remove_span(text, match):
+    """
+    Removes the matched code from the string to simplify further parsing. Slices at the
+    match position rather than searching for the matched text again with str.replace.
+    """
+    start, end = match.span()
+    return (text[:start] + text[end:]).strip()
+
+def _extract_code(filename_no_ext):
+    """
+    Finds the video code in filename_no_ext. A bracketed code anywhere takes priority over
+    a plain COMPANY-123 style code. Returns (code, string with the code removed), or
+    (None, filename_no_ext) if there is no code.
+    """
+    match_code = CODE_PATTERN.search(filename_no_ext)
+    if not match_code:
+        return None, filename_no_ext
+    if match_code.group(1) is None and "[" in filename_no_ext[match_code.end():]:
+        # The leftmost match is a plain code, but a bracketed code later on still wins
+        match_code = CODE_PATTERN_BRACKETS.search(filename_no_ext, match_code.end()) or match_code
+
+    if match_code.group(1) is not None: # [CODE]
+        return match_code.group(1), _remove_span(filename_no_ext, match_code)
+
+    potential_code = match_code.group(2)
+    # Filter out common series/episode patterns (e.g., _ep01, -part2)
+    # Check if the potential code ends with an episode/part marker followed by numbers.
+    if _is_episode_code(potential_code): # Code looked like an episode/part, so don't extract it as code
+        return None, filename_no_ext
+    return potential_code, _remove_span(filename_no_ext, match_code)
+
+def _is_plain_title(filename_no_ext):
+    """
+    True if filename_no_ext has none of the structure the extractors look for, so it can
+    only be a title: codes need a '[' or a digit, and both actor patterns need whitespace
+    or an underscore before the names.
+    """
+    if filename_no_ext.isascii():
+        # Deleting every structural character changes the length iff one is present
+        return len(filename_no_ext.translate(STRUCTURE_CHARS_DELETE_TABLE)) == len(filename_no_ext)
+    # Unicode digits and whitespace also count (the patterns use \d and \s)
+    return ("[" not in filename_no_ext and "_" not in filename_no_ext
+            and not any(c.isdigit() or c.isspace() for c in filename_no_ext))
+
+def _normalize_title(title_candidate):
+    """
+    Cleans up a title candidate: dots/underscores become spaces, double dashes become one,
+    whitespace runs collapse to a single space, and leading/trailing spaces or dashes go.
+    """
+    title = title_candidate.translate(TITLE_SEPARATOR_TABLE) # One C-level pass, no regex
+    if "-" in title: # Most titles have no dash at all
+        title = DOUBLE_DASH_PATTERN.sub("-", title) # double dash to single
+    return " ".join(title.split()).strip(" -") # Normalize spaces and strip
+
+def _extract_actors_dash_separated(working_string):
+    """
+    Looks for actors after a " - " separator at the end of working_string, e.g.
+    "Title - Actor A, Actor B & Actor C". Returns (actors, remaining_string); actors is
+    empty and the string unchanged if there is no such suffix.
+    """
+    if "-" not in working_string: # The separator can't match, skip the regex walk
+        return [], working_string
+    match_actors_dash = ACTOR_PATTERN_DASH_SEPARATOR.search(working_string)
+    if not match_actors_dash:
+        return [], working_string
+    actor_string = match_actors_dash.group(1)
+    # Split actor string by comma or ampersand, then clean up each name.
+    # Most filenames name a single actor, which needs no regex split.
+    if "," in actor_string or "&" in actor_string:
+        names = ACTOR_NAME_DELIMITER_PATTERN.split(actor_string)
+    else:
+        names = [actor_string]
+    # Remove the matched actor string from the working_string for title extraction
+    return ([name.strip().replace("_", " ") for name in names],
+            working_string[:match_actors_dash.start()].strip(" -_."))
+
+def _extract_actors_suffix_heuristic(working_string):
+    """
+    Looks for one or two actor names at the very end of working_string when there is no
+    " - " separator. Returns (actors, remaining_string); actors is empty and the string
+    unchanged if nothing actor-like is found.
+    """
+    # Cheap pre-checks for the common miss: the pattern needs a letter (or apostrophe) at
+    # the end and a space/underscore before it. '$' also matches before a trailing newline.
+    end = working_string[:-1] if working_string.endswith("\n") else working_string
+    if not end or not (end[-1].isascii() and (end[-1].isalpha() or end[-1] == "'")):
+        return [], working_string
+    if end.isprintable(): # Other whitespace is non-printable, that case is left to the regex
+        # The last name part starts with a capital right after the last space/underscore
+        cut = max(end.rfind("_"), end.rfind(" "))
+        if cut == -1 or not "A" <= end[cut + 1] <= "Z":
+            return [], working_string
+
+    suffix_actor_match = ACTOR_PATTERN_SUFFIX_HEURISTIC.search(working_string)
+
+    if suffix_actor_match:
+        actor_candidate_str = suffix_actor_match.group(1) # The matched actor(s) string part e.g. "ActorA_ActorB" or "ActorName"
+
+        # Filter 1: Broad filter for the whole candidate string
+        # Avoid common filename suffixes that are not actors like "final" or "trailer".
+        # Numbered suffixes like "_Part1" never get here: the pattern only captures letters.
+        is_blacklisted_candidate = actor_candidate_str.lower() in COMMON_NON_ACTOR_SUFFIXES
+
+        if not is_blacklisted_candidate:
+            # Filter 2: Per-word filter for parts of names
+            # The suffix pattern has already validated the whole candidate in one pass: it is
+            # one or two parts, each a single initial or a capitalized word, captured as groups
+            # 2 and 3. So no split or per-part shape check is needed; what's left is that a
+            # word must not be a common stop-word (single initials are always allowed).
+            name_parts = [suffix_actor_match.group(2)]
+            if suffix_actor_match.group(3) is not None:
+                name_parts.append(suffix_actor_match.group(3))
+
+            if all(len(part) == 1 or part.lower() not in COMMON_NON_ACTOR_WORDS for part in name_parts):
+                # Decide how to group the name parts
+                # suffix_actor_match.group(0) includes the separator, e.g., "_ActorA_ActorB"
+                # If original separator included an underscore and we have multiple valid parts,
+                # assume they are distinct actors or parts of a name that were underscore_separated.
+                if len(name_parts) > 1 and "_" in suffix_actor_match.group(0):
+                    final_actors_suffix = name_parts # Treat as potentially separate if underscore was involved
+                else: # Single valid part, or space-separated parts that form one name.
+                    final_actors_suffix = [" ".join(name_parts)]
+                return final_actors_suffix, working_string[:suffix_actor_match.start(0)].strip(" _-.")
+
+    return [], working_string
+
+# Filenames are re-parsed across scan, index and display passes; parsing is a pure function
+# of the string, so results are memoized. Bounded to keep memory flat on huge libraries.
+PARSE_CACHE_SIZE = 4096
+
+class ParseResult(collections.namedtuple("ParseResult", "code actors title original_filename")):
+    """
+    Immutable parse result, as kept in the parse cache: a tuple is much smaller than a dict,
+    and actors is a tuple so cached results can be shared safely. to_dict() gives the
+    parse_filename shape with a fresh actors list.
+    """
+    __slots__ = ()
+
+    def to_dict(self):
+        return {
+            "code": self.code,
+            "actors": list(self.actors),
+            "title": self.title,
+            "original_filename": self.original_filename
+        }
 
 def parse_filename(filename_string):
     """
@@ -14,162 +230,74 @@ def parse_filename(filename_string):
               "title": str or None
               "original_filename": str
     """
-    original_filename = filename_string
+    if not filename_string or filename_string.rfind('.') == 0:
+        # Nothing before the extension (e.g. ".DS_Store"): nothing to parse, and no reason to
+        # let hidden files take up parse cache entries
+        return ParseResult(None, (), None, filename_string).to_dict()
+
+    # A fresh dict and list on every call: callers may modify the result
+    return _parse_filename_cached(filename_string).to_dict()
+
+def parse_filenames(filenames):
+    """
+    Parses a batch of filenames, e.g. a whole directory listing, in one call.
+
+    Each distinct name is parsed once per batch even if the batch has more distinct names
+    than the parse cache holds, so repeated names don't depend on what is still cached.
+
+    Args:
+        filenames (iterable of str): The video filenames (including extensions).
+
+    Returns:
+        list of dict: One parse_filename result per input name, in input order. Every
+              result is a fresh dict, also for repeated names.
+    """
+    parsed = {} # filename -> ParseResult, for this batch only
+    results = []
+    # Locals for the loop: saves a global/attribute lookup per name on large directories
+    parse_cached = _parse_filename_cached
+    get_parsed = parsed.get
+    append_result = results.append
+    for filename_string in filenames:
+        if not filename_string or filename_string.rfind('.') == 0:
+            append_result(ParseResult(None, (), None, filename_string).to_dict())
+            continue
+        result = get_parsed(filename_string)
+        if result is None:
+            result = parsed[filename_string] = parse_cached(filename_string)
+        append_result(result.to_dict())
+    return results
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_filename_cached(filename_string):
+    """Does the actual parsing for parse_filename; returns a ParseResult."""
     filename_no_ext = filename_string.rsplit('.', 1)[0] # Remove extension for easier parsing
 
+    if _is_plain_title(filename_no_ext):
+        # Nothing for the code or actor patterns to find; the name is just a title
+        return ParseResult(None, (), _normalize_title(filename_no_ext) or filename_no_ext or None, filename_string)
+
     extracted_code = None
     extracted_actors = []
     extracted_title = None
 
-    # Regex for code:
-    # Pattern 1: [ANYTHING-REASONABLE-IN-BRACKETS] (e.g., [ABC-123], [XYZ_007], [CODE789])
-    code_pattern1 = r"\[([\w.-]+)\]" # Allows word chars, dots, hyphens within brackets
-    # Pattern 2: COMPANY-CODE or COMPANY_CODE (e.g., XYZ-007, Publisher_CODE)
-    # Requires a structure like WORD-DIGITS or WORD_DIGITS. At least one digit is required.
-    # Allows for multiple words before the hyphen/underscore e.g. LONG_COMPANY_NAME-123
-    # Removed \b at the end as it prevented matching if code was followed by underscore.
-    code_pattern2 = r"((?:[A-Z][A-Za-z0-9]*_)*[A-Z][A-Za-z0-9]*[-_][A-Za-z0-9]*\d[A-Za-z0-9]*)"
-
-
-    match_code1 = re.search(code_pattern1, filename_no_ext)
-    if match_code1:
-        extracted_code = match_code1.group(1)
-        # Remove the matched code from the string to simplify further parsing
-        filename_no_ext = filename_no_ext.replace(match_code1.group(0), "").strip()
-    else:
-        match_code2 = re.search(code_pattern2, filename_no_ext)
-        if match_code2:
-            potential_code = match_code2.group(1)
-            # Filter out common series/episode patterns (e.g., _ep01, -part2)
-            # Check if the potential code ends with an episode/part marker followed by numbers.
-            if not re.search(r"[_.-](?:ep|episode|part|vol|chapter|sc)[_.-]?\d+$", potential_code, re.IGNORECASE):
-                extracted_code = potential_code
-                filename_no_ext = filename_no_ext.replace(match_code2.group(0), "").strip()
-            else: # Code looked like an episode/part, so don't extract it as code
-                pass # extracted_code remains None or its value from code_pattern1
-
-    # Regex for actors:
-    # This is a challenging part and will be kept simple for now.
-    # It tries to find names that are often at the end, sometimes after " - ".
-    # Regex for actors:
-    # Pattern 1: " - Actor Name1, Actor Name2" or " - Actor Name1 & Actor Name2" or " - SingleActorName"
-    # Looks for a hyphen separator, then capitalized words (potentially with spaces, underscores, or dots)
-    # separated by common delimiters like ',', '&'.
-    actor_pattern_dash_separator = r"\s-\s+((?:[A-Z][\w\s'.-]+?)(?:\s*[,&]\s*[A-Z][\w\s'.-]+?)*)$"
-
-    # Pattern 2: Underscore or space separated actors at the end of the string if no clear " - " separator
-    # This is more heuristic. Looks for sequences of capitalized words, possibly joined by underscores.
-    # Example: Cool_Movie_Clip_ActorA_ActorB.mp4 -> ActorA, ActorB
-    # Example: Movie Title Actor One Actor Two.mp4 -> Actor One, Actor Two
-    # This pattern attempts to identify segments that are likely actor names.
-    # It looks for words starting with a capital letter, possibly containing more capital letters (Initials)
-    # or hyphens (Jean-Claude).
-    actor_pattern_suffix_heuristic = r"((?:[A-Z][a-zA-Z'-]+(?:_[A-Z][a-zA-Z'-]+)*)(?:[\s_]+(?:[A-Z][a-zA-Z'-]+(?:_[A-Z][a-zA-Z'-]+)*))*)$"
-
+    extracted_code, filename_no_ext = _extract_code(filename_no_ext)
 
+    # Actors: this is a challenging part and will be kept simple for now.
+    # It tries to find names that are often at the end, sometimes after " - ".
     working_string = filename_no_ext # String to be progressively shortened
 
     # Attempt to find actors using the " - " separator first
-    match_actors_dash = re.search(actor_pattern_dash_separator, working_string)
-    if match_actors_dash:
-        actor_string = match_actors_dash.group(1)
-        # Remove the matched actor string from the working_string for title extraction
-        working_string = working_string[:match_actors_dash.start()].strip(" -_.")
-        # Split actor string by comma or ampersand, then clean up each name
-        extracted_actors = [name.strip().replace("_", " ") for name in re.split(r"\s*[,&]\s*", actor_string)]
+    dash_actors, working_string = _extract_actors_dash_separated(working_string)
+    if dash_actors:
+        extracted_actors = dash_actors
     else:
-        # If no " - " separator, try the heuristic suffix pattern
-        # Split the string by common separators (space, underscore, dot)
-        # and evaluate the last few parts if they look like names.
-        parts = re.split(r"[_\s.]+", working_string)
-        potential_actor_segments = []
-        # Heuristic: check the last 1 to 4 segments
-        # This needs to be conservative to avoid grabbing title parts.
-        # Only consider segments that are capitalized or common actor patterns.
-        num_parts_to_check = min(len(parts), 4)
-        for i in range(1, num_parts_to_check + 1):
-            segment = " ".join(parts[-i:]) # e.g., "Actor", "Actor B", "Actor C D"
-            # A simple check: if it contains at least one capitalized word.
-            # More robust: use a regex that matches actor-like names.
-            # This is still very basic.
-            if re.search(r"\b[A-Z][a-z']+\b", segment): # Basic check for capitalized word
-                 # Check if it's not a common non-actor word (very basic list)
-                if not any(kw in segment.lower() for kw in ['part', 'ep', 'the', 'clip']):
-                    # If a potential segment is found, try to match it more formally
-                    # This is tricky; for now, let's assume if the last part(s) look like names, they are.
-                    # The `actor_pattern_suffix_heuristic` can be too greedy if not anchored.
-                    # Let's try to match the whole end of the string for actors if no dash separator
-
-                    # Re-join parts to form a string to test suffix pattern on
-                    # This is a bit redundant if we are already iterating parts
-                    # Let's refine this:
-                    pass # Placeholder for a better suffix actor extraction
-
-
-        # Revised Suffix Actor Extraction:
-        # Try to match known actor patterns at the end of the string.
-        # This will be an iterative process.
-        # Consider words like "Actor", "Actress" as keywords to help.
-        # For now, let's try a simpler approach: if the last few words are capitalized.
-
-        # Simplified Suffix Actor Extraction:
-        # Only attempts to find actors if they appear at the very end of the string (after code removal),
+        # No " - " separator: try one or two actor names at the very end of the string,
         # matching patterns like "_ActorName", " ActorName", "_ActorA_ActorB", or " ActorA ActorB".
         # This is intentionally conservative to reduce false positives from title words.
-        else:
-            # working_string is filename_no_ext after code removal.
-            # Regex tries to capture one or two capitalized words at the end, preceded by a space or underscore.
-            # Group 1 captures the whole actor string (e.g., "ActorA_ActorB" or "ActorName").
-            suffix_actor_match = re.search(r"[_\s](([A-Z][a-z']+|[A-Z])(?:[_\s]([A-Z][a-z']+|[A-Z]))?)$", working_string)
-
-            if suffix_actor_match:
-                actor_candidate_str = suffix_actor_match.group(1) # The matched actor(s) string part e.g. "ActorA_ActorB" or "ActorName"
-
-                # Filter 1: Broad filter for the whole candidate string
-                # Avoid common filename suffixes that are not actors like "_Part1", " The_End", "final"
-                is_blacklisted_candidate = False
-                if re.search(r"(?:Part|Ep|Vol|Chapter|Scene|The|An|A)[_\s]?\d+$", actor_candidate_str, re.IGNORECASE):
-                    is_blacklisted_candidate = True
-                if actor_candidate_str.lower() in ['final', 'extended', 'uncut', 'remastered', 'official', 'trailer', 'movie', 'film', 'ost', 'soundtrack']:
-                    is_blacklisted_candidate = True
-
-                if not is_blacklisted_candidate:
-                    name_parts = re.split(r"[_\s]+", actor_candidate_str)
-                    valid_name_parts = []
-
-                    # Filter 2: Per-word filter for parts of names
-                    # Each part should look like a name and not be a common stop-word (unless it's a single initial)
-                    individual_word_blacklist = ['in', 'on', 'of', 'a', 'an', 'the', 'is', 'at', 'to', 'and', 'or', 'but', 'vs', 'vs.']
-
-                    for part in name_parts:
-                        is_valid_part = False
-                        if re.fullmatch(r"[A-Z]", part): # Single uppercase letter (Initial)
-                            is_valid_part = True
-                        elif re.fullmatch(r"[A-Z][a-z']+", part): # Capitalized word
-                            if part.lower() not in individual_word_blacklist:
-                                is_valid_part = True
-
-                        if is_valid_part:
-                            valid_name_parts.append(part)
-                        else: # Invalid part encountered, means the whole candidate is likely not an actor string
-                            valid_name_parts = [] # Discard all parts for this candidate
-                            break
-
-                    if valid_name_parts:
-                        # Decide how to group the valid_name_parts
-                        final_actors_suffix = []
-                        # suffix_actor_match.group(0) includes the separator, e.g., "_ActorA_ActorB"
-                        # If original separator included an underscore and we have multiple valid parts,
-                        # assume they are distinct actors or parts of a name that were underscore_separated.
-                        if len(valid_name_parts) > 1 and "_" in suffix_actor_match.group(0):
-                            final_actors_suffix.extend(valid_name_parts) # Treat as potentially separate if underscore was involved
-                        elif valid_name_parts: # Single valid part, or space-separated parts that form one name.
-                            final_actors_suffix.append(" ".join(valid_name_parts))
-
-                        if final_actors_suffix:
-                            extracted_actors = final_actors_suffix
-                            working_string = working_string[:suffix_actor_match.start(0)].strip(" _-.")
-            # If no suffix actor match or filtered out, working_string remains as is.
+        suffix_actors, working_string = _extract_actors_suffix_heuristic(working_string)
+        if suffix_actors:
+            extracted_actors = suffix_actors
 
     # Title is what's left in 'working_string' after removing code and actors
     # Clean up common separators like dots, underscores, leading/trailing hyphens
@@ -181,9 +309,7 @@ def parse_filename(filename_string):
     title_candidate = working_string.strip()
 
     # General cleanup for title: replace multiple spaces/underscores, strip unwanted chars
-    extracted_title = re.sub(r"[._]", " ", title_candidate) # Replace dots/underscores with spaces
-    extracted_title = re.sub(r"-\s*-", "-", extracted_title) # double dash to single
-    extracted_title = re.sub(r"\s+", " ", extracted_title).strip(" -") # Normalize spaces and strip
+    extracted_title = _normalize_title(title_candidate)
 
     if not extracted_title and not extracted_code and not extracted_actors and filename_no_ext:
         # If nothing else was extracted, the whole filename (no ext) is the title
@@ -197,12 +323,10 @@ def parse_filename(filename_string):
     if extracted_title and extracted_code and extracted_title.lower() == extracted_code.lower():
         extracted_title = None
 
-    return {
-        "code": extracted_code,
-        "actors": list(set(extracted_actors)), # Remove duplicates
-        "title": extracted_title if extracted_title else None,
-        "original_filename": original_filename
-    }
+    return ParseResult(sys.intern(extracted_code) if extracted_code else None, # Repeated codes share one string
+                       tuple(dict.fromkeys(extracted_actors)), # Remove duplicates, keeping first-seen order
+                       extracted_title if extracted_title else None,
+                       filename_string)
 
 if __name__ == '__main__':
     test_filenames = [
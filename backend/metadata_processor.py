@@ -1,10 +1,12 @@
+import concurrent.futures # For processing several files at once
+import functools
+import itertools
+import logging
 import os
 import sys # For path modification
 import json # For pretty printing results
 import shutil # For creating/removing dummy files if needed
-import re # For filename sanitization
 import sqlite3 # For test verification
-import subprocess # For running DB setup in test
 
 # Adjust sys.path to ensure project modules can be imported
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -14,24 +16,40 @@ if PROJECT_ROOT not in sys.path:
 
 # Project-specific imports
 from backend.filename_parser import parse_filename
-from backend.actor_management import get_actor_id_by_name_or_alias, get_actor_name_by_id #, add_actor (potential future use)
-from ai_models.content_analysis import extract_text_from_video_frames, extract_info_from_audio
-from backend.database_operations import update_video_record # New import
+from backend.actor_management import get_actor_ids_by_names_or_aliases, get_actor_names_by_ids, close_connections #, add_actor (potential future use)
+from backend.database_operations import update_video_record, bulk_update_video_records, close_all
 
 # Assuming the database is in the 'database' directory relative to the project root.
 DATABASE_DIR = os.path.join(PROJECT_ROOT, 'database') # Use PROJECT_ROOT
 DEFAULT_DB_PATH = os.path.join(DATABASE_DIR, 'video_management.db')
-
-
+# Worker threads for process_video_files. Per-file time is dominated by waiting on content
+# analysis and the database, not by Python code, so threads overlap that waiting.
+DEFAULT_MAX_WORKERS = 4
+# Videos per write transaction in process_video_files: one commit per batch instead of per file,
+# while keeping the buffered metadata and the write lock hold time bounded
+BULK_WRITE_BATCH_SIZE = 500
+
+# Filename sanitization, prepared once: sanitize_filename_part runs for every title, code and
+# actor name of every processed file. Unsafe characters are a fixed set, so a translate table
+# replaces them in one C-level pass without the regex engine.
+FILENAME_UNSAFE_CHARS_TABLE = str.maketrans(dict.fromkeys('\\/:*?"<>|', '_'))
+# Underscores and dots to spaces, for titles built from a bare filename
+FALLBACK_TITLE_SEPARATOR_TABLE = str.maketrans("_.", "  ")
+# The same actor names and codes are sanitized again for every video they appear in;
+# sanitizing is a pure function of the string, so results are memoized (bounded).
+SANITIZE_CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=SANITIZE_CACHE_SIZE)
 def sanitize_filename_part(part):
     """Removes or replaces characters not suitable for filenames."""
     if not part:
         return ""
     # Remove characters like / : * ? " < > |
-    sanitized = re.sub(r'[\\/:*?"<>|]', '_', part)
-    # Replace multiple spaces or underscores with a single one if desired, or just strip
-    sanitized = re.sub(r'\s+', ' ', sanitized).strip() # Consolidate multiple spaces to one
-    return sanitized
+    sanitized = part.translate(FILENAME_UNSAFE_CHARS_TABLE)
+    # Consolidate whitespace runs to a single space and strip. split() breaks on the same
+    # whitespace as the regex \s+ would, so no regex is needed.
+    return " ".join(sanitized.split())
 
 def generate_standardized_filename(consolidated_metadata, original_extension):
     """
@@ -55,39 +73,24 @@ def generate_standardized_filename(consolidated_metadata, original_extension):
 
     # Title part
     title = consolidated_metadata.get('title')
-    if title:
-        parts.append(sanitize_filename_part(title))
-    else:
-        parts.append("Unknown Title") # Always include a title placeholder
+    # Always include a title placeholder, also when sanitizing leaves nothing of the title
+    parts.append(sanitize_filename_part(title) or "Unknown Title")
 
     # Actors part
     actors = consolidated_metadata.get('actors') # List of {'id': ..., 'canonical_name': ...}
     if actors:
-        actor_names = sorted([sanitize_filename_part(actor['canonical_name']) for actor in actors])
-        if actor_names:
-             parts.append("- " + ", ".join(actor_names)) # Prepend with " - " if title exists
-
-    # Join parts
-    if not parts: # Should not happen if title is always present
-        base_name = "Untitled_Video"
-    elif len(parts) == 1 and title: # Only title is present
-        base_name = parts[0]
-    elif code_publisher_part and title and not actors: # Code/Pub and Title, no actors
-        base_name = f"{code_publisher_part} {parts[1]}"
-    elif not code_publisher_part and title and actors: # Title and Actors, no code/pub
-        base_name = f"{parts[0]} {parts[1]}" # parts[0] is title, parts[1] is " - Actors"
-    elif code_publisher_part and title and actors: # All parts
-         base_name = f"{code_publisher_part} {parts[1]} {parts[2]}"
-    else: # Other combinations or just title if it's the only thing
-        base_name = " ".join(parts)
+        actor_names = sorted(sanitize_filename_part(actor['canonical_name']) for actor in actors) # sorted builds the only list
+        parts.append("- " + ", ".join(actor_names)) # Prepend with " - " since a title is always present
 
+    # Every part is non-empty and already stripped, so a plain join can't produce double spaces
+    base_name = " ".join(parts)
 
     # Ensure base_name is not excessively long (optional, OS dependent)
     max_len = 200 # Arbitrary max length for the base filename part
     if len(base_name) > max_len:
         base_name = base_name[:max_len].strip()
 
-    return f"{base_name}{original_extension}"
+    return base_name + original_extension
 
 
 def process_video_file(video_filepath, db_path):
@@ -95,29 +98,30 @@ def process_video_file(video_filepath, db_path):
     Processes a video file to extract, analyze, and consolidate metadata.
     Also updates the database with this information.
     """
+    result = _compute_video_metadata(video_filepath, db_path)
+    if result:
+        _persist_video_metadata(db_path, result["consolidated_metadata"])
+    return result
+
+
+def _compute_video_metadata(video_filepath, db_path):
+    """
+    Does the extraction, analysis and consolidation for process_video_file, without writing
+    to the database (actor lookups only read from it). Returns the same result dict as
+    process_video_file, or None if the file doesn't exist.
+    """
     print(f"\nProcessing video: {video_filepath}")
     if not os.path.exists(video_filepath):
         print(f"Error: Video file not found at {video_filepath}")
         return None
 
     original_filename_with_ext = os.path.basename(video_filepath)
-    original_extension = os.path.splitext(original_filename_with_ext)[1]
+    original_base_name, original_extension = os.path.splitext(original_filename_with_ext)
 
     # 1. Parse Filename
     parsed_filename_data = parse_filename(original_filename_with_ext)
 
-    # 2. Actor Lookup (Filename)
-    processed_actors_from_filename = []
-    if parsed_filename_data.get("actors"):
-        for actor_name_from_fn in parsed_filename_data["actors"]:
-            actor_id = get_actor_id_by_name_or_alias(db_path, actor_name_from_fn)
-            processed_actors_from_filename.append({
-                'name': actor_name_from_fn,
-                'id': actor_id,
-                'found_in_db': actor_id is not None
-            })
-
-    # 3. Content Analysis Trigger
+    # 2. Content Analysis Trigger
     run_content_analysis = False
     # Trigger if essential data is missing or if actors list is empty (even if key "actors" exists)
     if not parsed_filename_data.get("title") or \
@@ -126,42 +130,67 @@ def process_video_file(video_filepath, db_path):
         run_content_analysis = True
         print("Flagging for content analysis due to missing/incomplete filename metadata.")
 
-    # 4. Content Analysis (Placeholder)
+    # 3. Content Analysis (Placeholder)
     raw_content_analysis_results = {}
-    processed_actors_from_content = []
+    on_screen_actor_names = []
+    mentioned_actor_names = []
     potential_publisher_ocr = None
     potential_title_ocr = None
     potential_title_audio = None
 
     if run_content_analysis:
         print("Running content analysis (placeholders)...")
+        # Imported here so callers that never reach content analysis don't load the AI models
+        from ai_models.content_analysis import extract_text_from_video_frames, extract_info_from_audio
         ocr_results = extract_text_from_video_frames(video_filepath)
         audio_results = extract_info_from_audio(video_filepath)
         raw_content_analysis_results = {"ocr": ocr_results, "audio": audio_results}
 
-        for actor_name_ocr in ocr_results.get("on_screen_actor_names", []):
-            actor_id = get_actor_id_by_name_or_alias(db_path, actor_name_ocr)
-            processed_actors_from_content.append({
-                'name': actor_name_ocr, 'id': actor_id,
-                'source': 'ocr_on_screen', 'found_in_db': actor_id is not None
-            })
-
-        for actor_name_audio in audio_results.get("mentioned_actor_names", []):
-            actor_id = get_actor_id_by_name_or_alias(db_path, actor_name_audio)
-            processed_actors_from_content.append({
-                'name': actor_name_audio, 'id': actor_id,
-                'source': 'audio_mentioned', 'found_in_db': actor_id is not None
-            })
+        on_screen_actor_names = ocr_results.get("on_screen_actor_names", [])
+        mentioned_actor_names = audio_results.get("mentioned_actor_names", [])
 
         potential_publisher_ocr = ocr_results.get("publisher_logo_text")
         for text_item in ocr_results.get("other_text", []):
-            if "episode" in text_item.lower() or "title" in text_item.lower() or \
-               (len(text_item.split()) > 2 and any(w.istitle() for w in text_item.split())): # Crude title check
+            text_lower = text_item.lower() # Lowered and split once per text, not per check
+            words = text_item.split()
+            if "episode" in text_lower or "title" in text_lower or \
+               (len(words) > 2 and any(w.istitle() for w in words)): # Crude title check
                 potential_title_ocr = text_item
                 break
         if audio_results.get("mentioned_title_keywords"):
             potential_title_audio = " ".join(audio_results["mentioned_title_keywords"])
 
+    # 4. Actor Lookup: the filename, OCR and audio names are resolved together, so a video
+    # costs one lookup instead of one per source
+    filename_actor_names = parsed_filename_data.get("actors") or []
+    actor_ids = get_actor_ids_by_names_or_aliases(
+        db_path, itertools.chain(filename_actor_names, on_screen_actor_names, mentioned_actor_names)
+    )
+
+    processed_actors_from_filename = []
+    for actor_name_from_fn in filename_actor_names:
+        actor_id = actor_ids[actor_name_from_fn]
+        processed_actors_from_filename.append({
+            'name': actor_name_from_fn,
+            'id': actor_id,
+            'found_in_db': actor_id is not None
+        })
+
+    processed_actors_from_content = []
+    for actor_name_ocr in on_screen_actor_names:
+        actor_id = actor_ids[actor_name_ocr]
+        processed_actors_from_content.append({
+            'name': actor_name_ocr, 'id': actor_id,
+            'source': 'ocr_on_screen', 'found_in_db': actor_id is not None
+        })
+
+    for actor_name_audio in mentioned_actor_names:
+        actor_id = actor_ids[actor_name_audio]
+        processed_actors_from_content.append({
+            'name': actor_name_audio, 'id': actor_id,
+            'source': 'audio_mentioned', 'found_in_db': actor_id is not None
+        })
+
     # 5. Consolidate Metadata
     consolidated_metadata = {
         "code": parsed_filename_data.get("code"),
@@ -174,25 +203,29 @@ def process_video_file(video_filepath, db_path):
     }
 
     if not consolidated_metadata["title"]:
-        title_options = [potential_title_ocr, potential_title_audio,
-                         os.path.splitext(original_filename_with_ext)[0].replace("_", " ").replace(".", " ")]
-        consolidated_metadata["title"] = next((t for t in title_options if t), "Untitled Video")
+        # The filename fallback is only built if neither OCR nor audio came up with a title
+        consolidated_metadata["title"] = (potential_title_ocr or potential_title_audio
+                                          or original_base_name.translate(FALLBACK_TITLE_SEPARATOR_TABLE)
+                                          or "Untitled Video")
         print(f"Used title from {'OCR' if consolidated_metadata['title'] == potential_title_ocr else 'Audio' if consolidated_metadata['title'] == potential_title_audio else 'filename'}: {consolidated_metadata['title']}")
 
     if potential_publisher_ocr:
         consolidated_metadata["publisher"] = potential_publisher_ocr
         print(f"Used publisher from OCR: {potential_publisher_ocr}")
 
-    final_actor_map = {}
-    all_processed_actors = processed_actors_from_filename + processed_actors_from_content
-    for actor_info in all_processed_actors:
-        actor_id = actor_info['id']
-        if actor_id is not None:
-            if actor_id not in final_actor_map:
-                canonical_name = get_actor_name_by_id(db_path, actor_id)
-                if canonical_name:
-                    final_actor_map[actor_id] = {"id": actor_id, "canonical_name": canonical_name}
-    consolidated_metadata["actors"] = list(final_actor_map.values())
+    # Matched actor IDs in first-seen order, without duplicates. chain walks both lists in
+    # place instead of concatenating them into a new one.
+    matched_actor_ids = dict.fromkeys(
+        actor_info['id']
+        for actor_info in itertools.chain(processed_actors_from_filename, processed_actors_from_content)
+        if actor_info['id'] is not None
+    )
+    # One lookup for all canonical names instead of a database round-trip per actor
+    canonical_names = get_actor_names_by_ids(db_path, matched_actor_ids)
+    consolidated_metadata["actors"] = [
+        {"id": actor_id, "canonical_name": canonical_names[actor_id]}
+        for actor_id in matched_actor_ids if canonical_names.get(actor_id)
+    ]
 
     # Generate Standardized Filename
     consolidated_metadata["standardized_filename"] = generate_standardized_filename(
@@ -200,7 +233,20 @@ def process_video_file(video_filepath, db_path):
     )
     print(f"Generated standardized filename: {consolidated_metadata['standardized_filename']}")
 
-    # Database Update
+    # Prepare return data (as before, but consolidated_metadata now includes standardized_filename)
+    return {
+        "original_filepath": video_filepath,
+        "parsed_data_from_filename": parsed_filename_data,
+        "actors_from_filename_lookup": processed_actors_from_filename,
+        "content_analysis_triggered": run_content_analysis,
+        "raw_content_analysis_results": raw_content_analysis_results if run_content_analysis else "Not Performed",
+        "actors_from_content_lookup": processed_actors_from_content if run_content_analysis else [],
+        "consolidated_metadata": consolidated_metadata
+    }
+
+
+def _persist_video_metadata(db_path, consolidated_metadata):
+    """Writes consolidated metadata from _compute_video_metadata to the database."""
     update_video_record(
         db_path,
         consolidated_metadata["filepath"],
@@ -212,19 +258,69 @@ def process_video_file(video_filepath, db_path):
         consolidated_metadata["actors"]
     )
 
-    # Prepare return data (as before, but consolidated_metadata now includes standardized_filename)
-    return {
-        "original_filepath": video_filepath,
-        "parsed_data_from_filename": parsed_filename_data,
-        "actors_from_filename_lookup": processed_actors_from_filename,
-        "content_analysis_triggered": run_content_analysis,
-        "raw_content_analysis_results": raw_content_analysis_results if run_content_analysis else "Not Performed",
-        "actors_from_content_lookup": processed_actors_from_content if run_content_analysis else [],
-        "consolidated_metadata": consolidated_metadata
-    }
+
+def _compute_video_metadata_or_none(video_filepath, db_path):
+    """
+    _compute_video_metadata for process_video_files' workers: an unexpected error for one
+    file gives None for that file instead of ending the whole run.
+    """
+    try:
+        return _compute_video_metadata(video_filepath, db_path)
+    except Exception as e:
+        print(f"Error processing video {video_filepath}: {e}")
+        return None
+
+
+def _write_pending_results(db_path, results, pending_indexes):
+    """
+    Writes the results at pending_indexes with one bulk_update_video_records call. The batch
+    is one transaction, so on failure none of it is stored: its results are set to None,
+    like files that could not be processed, instead of being reported as written.
+    """
+    if not pending_indexes:
+        return
+    written = bulk_update_video_records(db_path, [results[i]["consolidated_metadata"] for i in pending_indexes])
+    if not written:
+        print(f"Error: writing a batch of {len(pending_indexes)} videos to the database failed; "
+              "they are reported as not processed.")
+        for i in pending_indexes:
+            results[i] = None
+
+
+def process_video_files(video_filepaths, db_path, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Processes several video files like process_video_file. The extraction and analysis run
+    concurrently in worker threads; the results are written from the calling thread with
+    bulk_update_video_records, one transaction per BULK_WRITE_BATCH_SIZE videos.
+
+    Returns:
+        list: One process_video_file result per input path, in input order (None for files
+              that could not be processed or written).
+    """
+    video_filepaths = list(video_filepaths)
+    if not video_filepaths:
+        return []
+    results = []
+    pending_indexes = [] # Positions in results of the computed videos not written yet
+    # At least one worker, and no more than there are files
+    worker_count = max(1, min(max_workers, len(video_filepaths)))
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=worker_count) as executor:
+            for result in executor.map(_compute_video_metadata_or_none, video_filepaths, itertools.repeat(db_path)):
+                if result:
+                    pending_indexes.append(len(results))
+                results.append(result)
+                if len(pending_indexes) >= BULK_WRITE_BATCH_SIZE:
+                    _write_pending_results(db_path, results, pending_indexes)
+                    pending_indexes = []
+    finally:
+        # Also reached if the run is interrupted: results already computed are still written
+        _write_pending_results(db_path, results, pending_indexes)
+    return results
 
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
     db_path = DEFAULT_DB_PATH
 
     # Ensure database is set up (run database_setup.py manually or via CLI if needed)
@@ -234,12 +330,12 @@ if __name__ == '__main__':
         print(f"Deleting existing test database: {db_path}")
         os.remove(db_path)
 
-    # Run setup (using subprocess as in main.py example)
-    db_setup_script_path = os.path.join(PROJECT_ROOT, 'database', 'database_setup.py')
+    # Run setup in-process (as main.py does), no separate interpreter needed
+    from database.database_setup import main as setup_db_main
     try:
-        print(f"Running database setup script: {db_setup_script_path}...")
-        subprocess.run(['python', db_setup_script_path], check=True, capture_output=True, text=True)
-        print("Database setup script completed successfully for testing.")
+        print("Running database setup...")
+        setup_db_main()
+        print("Database setup completed successfully for testing.")
     except Exception as e:
         print(f"Error during test DB setup: {e}")
         sys.exit(1) # Stop if DB setup fails
@@ -264,13 +360,15 @@ if __name__ == '__main__':
 
     print(f"\n--- Starting Metadata Processor Tests (DB: {db_path}) ---")
     all_results = []
-    for video_path in test_video_paths:
-        result = process_video_file(video_path, db_path)
+    for result in process_video_files(test_video_paths, db_path):
         if result:
             all_results.append(result)
             print(json.dumps(result['consolidated_metadata'], indent=4))
             print("-" * 40)
 
+    close_all() # Release cached connections and checkpoint the WAL before inspecting the file
+    close_connections()
+
     print("\n--- Verifying Database Content ---")
     try:
         conn = sqlite3.connect(db_path)
@@ -22,6 +22,14 @@ def create_table(conn, create_table_sql):
     except sqlite3.Error as e:
         print(e)
 
+def create_index(conn, create_index_sql):
+    """Create an index from the create_index_sql statement."""
+    try:
+        c = conn.cursor()
+        c.execute(create_index_sql)
+    except sqlite3.Error as e:
+        print(e)
+
 def main():
     conn = create_connection()
 
@@ -33,7 +41,7 @@ def main():
                                         title TEXT,
                                         publisher TEXT,
                                         duration_seconds INTEGER,
-                                        filepath TEXT UNIQUE,
+                                        filepath TEXT UNIQUE, -- Indexed by the UNIQUE constraint; update_video_record relies on it
                                         standardized_filename TEXT
                                     );"""
         create_table(conn, create_videos_table_sql)
@@ -68,6 +76,17 @@ def main():
         create_table(conn, create_actor_aliases_table_sql)
         print("Created 'actor_aliases' table (if it didn't exist).")
 
+        # Indexes for lookups by actor. Lookups by name, alias, filepath and video_id are
+        # already covered by the UNIQUE and PRIMARY KEY indexes above.
+        # Videos of an actor, and ON DELETE CASCADE when an actor is deleted; covering, so
+        # the video IDs come straight from the index
+        create_index(conn, """CREATE INDEX IF NOT EXISTS idx_video_actors_actor_id
+                              ON video_actors (actor_id, video_id);""")
+        # get_aliases_for_actor, and ON DELETE CASCADE when an actor is deleted
+        create_index(conn, """CREATE INDEX IF NOT EXISTS idx_actor_aliases_actor_id
+                              ON actor_aliases (actor_id);""")
+        print("Created actor lookup indexes (if they didn't exist).")
+
         # Insert sample data
         cursor = conn.cursor()
         try:
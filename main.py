@@ -1,41 +1,36 @@
 import argparse
+import logging
 import os
 import sys
 import json
-import subprocess # For running database_setup.py
 
 # Adjust sys.path to allow imports from subdirectories if main.py is in the project root
 # This ensures that 'backend' and 'ai_models' can be found.
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
 
-# Assuming database_setup.py has a main() function or can be run directly.
-# If database_setup.py is refactored to have an importable main function:
-# from database.database_setup import main as setup_db_main
-
 # Import functions from our project modules
-from backend.metadata_processor import process_video_file
-from backend.actor_management import add_actor, add_alias
+from database.database_setup import main as setup_db_main
+from backend.metadata_processor import process_video_files
+from backend.actor_management import add_actor, add_alias, close_connections
+from backend.database_operations import close_all
 
 DEFAULT_DB_RELATIVE_PATH = os.path.join("database", "video_management.db")
 
 def run_db_setup_script():
-    """Runs the database_setup.py script."""
-    db_setup_script_path = os.path.join('database', 'database_setup.py')
+    """Runs database_setup.py's main() in this process, without starting a new interpreter."""
     try:
-        print(f"Running database setup script: {db_setup_script_path}...")
-        subprocess.run(['python', db_setup_script_path], check=True, capture_output=True, text=True)
-        print("Database setup script completed successfully.")
+        print("Running database setup...")
+        setup_db_main()
+        print("Database setup completed successfully.")
         return True
-    except subprocess.CalledProcessError as e:
-        print(f"Error during database setup script execution: {e}")
-        print(f"Stdout: {e.stdout}")
-        print(f"Stderr: {e.stderr}")
-        return False
-    except FileNotFoundError:
-        print(f"Error: Database setup script not found at {db_setup_script_path}.")
+    except Exception as e:
+        print(f"Error during database setup: {e}")
         return False
 
 def main():
+    # Library modules only create loggers; the CLI decides where their output goes.
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
     parser = argparse.ArgumentParser(description="Video Classification Management System CLI")
 
     # Arguments
@@ -105,24 +100,27 @@ def main():
             print(f"\nProcessing videos in directory: {args.video_dir}")
             print(f"Using database: {effective_db_path}")
             video_extensions = ('.mp4', '.avi', '.mkv', '.mov', '.webm')
-            found_videos = 0
+            video_filepaths = []
             for filename in os.listdir(args.video_dir):
                 if filename.lower().endswith(video_extensions):
-                    found_videos += 1
-                    filepath = os.path.join(args.video_dir, filename)
-
-                    result = process_video_file(filepath, effective_db_path)
-                    if result and "consolidated_metadata" in result:
-                        print(f"\n--- Results for: {filename} ---")
-                        print(json.dumps(result["consolidated_metadata"], indent=4))
-                    else:
-                        print(f"No result or error processing {filepath}")
-                    print("-" * 40)
+                    video_filepaths.append(os.path.join(args.video_dir, filename))
                 else:
                     print(f"Skipping non-video file: {filename}")
 
-            if found_videos == 0:
+            # Files are analyzed concurrently; results come back in listing order
+            results = process_video_files(video_filepaths, effective_db_path)
+            for filepath, result in zip(video_filepaths, results):
+                if result and "consolidated_metadata" in result:
+                    print(f"\n--- Results for: {os.path.basename(filepath)} ---")
+                    print(json.dumps(result["consolidated_metadata"], indent=4))
+                else:
+                    print(f"No result or error processing {filepath}")
+                print("-" * 40)
+
+            if not video_filepaths:
                 print(f"No video files found in '{args.video_dir}'.")
+            close_all() # Release cached connections and checkpoint the WAL
+            close_connections()
 
     if not (args.video_dir or args.setup_db or args.add_actor or args.add_alias):
         print("No action requested. Use -h or --help for usage information.")
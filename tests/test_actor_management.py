@@ -3,16 +3,23 @@ import sys
 import os
 import sqlite3
 import subprocess
+import threading
+import weakref
 
 # Add project root to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from backend import actor_management
 from backend.actor_management import (
     add_actor,
     add_alias,
     get_actor_id_by_name_or_alias,
+    get_actor_ids_by_names_or_aliases,
     get_aliases_for_actor,
-    get_actor_name_by_id
+    get_actor_name_by_id,
+    get_actor_names_by_ids,
+    close_connections,
+    _get_db_connection
 )
 
 # Define path for the test database
@@ -78,6 +85,7 @@ class TestActorManagement(unittest.TestCase):
     @classmethod
     def tearDownClass(cls):
         """Remove the test database file after all tests in this class."""
+        close_connections() # Cached connections would otherwise keep using the deleted file
         if os.path.exists(TEST_DB_PATH):
             os.remove(TEST_DB_PATH)
             print(f"Test database {TEST_DB_PATH} removed.")
@@ -160,6 +168,32 @@ class TestActorManagement(unittest.TestCase):
         # Empty name
         self.assertIsNone(get_actor_id_by_name_or_alias(TEST_DB_PATH, ""))
 
+    def test_get_actor_ids_by_names_or_aliases(self):
+        actor_id = add_actor(TEST_DB_PATH, "Bulk Actor")
+        other_actor_id = add_actor(TEST_DB_PATH, "Other Bulk Actor")
+        add_alias(TEST_DB_PATH, actor_id, "BulkAlias")
+        add_alias(TEST_DB_PATH, other_actor_id, "Bulk Actor Alias")
+
+        names = ["Bulk Actor", "BulkAlias", "Other Bulk Actor", "NonExistent", "", "Bulk Actor"]
+        self.assertEqual(get_actor_ids_by_names_or_aliases(TEST_DB_PATH, names), {
+            "Bulk Actor": actor_id,
+            "BulkAlias": actor_id,
+            "Other Bulk Actor": other_actor_id,
+            "NonExistent": None,
+            "": None,
+        })
+        # Same answers as the one-name lookup
+        for name in names:
+            self.assertEqual(get_actor_ids_by_names_or_aliases(TEST_DB_PATH, [name])[name],
+                             get_actor_id_by_name_or_alias(TEST_DB_PATH, name))
+        self.assertEqual(get_actor_ids_by_names_or_aliases(TEST_DB_PATH, []), {})
+
+        # More names than fit in one lookup query
+        many_names = [f"Unknown {i}" for i in range(1200)] + ["BulkAlias"]
+        actor_ids = get_actor_ids_by_names_or_aliases(TEST_DB_PATH, many_names)
+        self.assertEqual(actor_ids["BulkAlias"], actor_id)
+        self.assertEqual(sum(actor_id is not None for actor_id in actor_ids.values()), 1)
+
 
     def test_get_aliases_for_actor(self):
         actor_id = add_actor(TEST_DB_PATH, "Actor With Aliases")
@@ -192,5 +226,43 @@ class TestActorManagement(unittest.TestCase):
         # None ID
         self.assertIsNone(get_actor_name_by_id(TEST_DB_PATH, None))
 
+    def test_get_actor_names_by_ids(self):
+        actor_id = add_actor(TEST_DB_PATH, "First Named")
+        other_actor_id = add_actor(TEST_DB_PATH, "Second Named")
+
+        self.assertEqual(get_actor_names_by_ids(TEST_DB_PATH, [other_actor_id, 9999, None, actor_id, other_actor_id]),
+                         {actor_id: "First Named", other_actor_id: "Second Named"})
+        self.assertEqual(get_actor_names_by_ids(TEST_DB_PATH, []), {})
+        self.assertEqual(get_actor_names_by_ids(TEST_DB_PATH, [None, 9999]), {})
+        # More IDs than fit in one lookup query
+        self.assertEqual(get_actor_names_by_ids(TEST_DB_PATH, list(range(10000, 11200)) + [actor_id]),
+                         {actor_id: "First Named"})
+
+    def test_connection_is_reused_until_closed(self):
+        conn = _get_db_connection(TEST_DB_PATH)
+        self.assertIs(_get_db_connection(TEST_DB_PATH), conn)
+        add_actor(TEST_DB_PATH, "Reused Connection Actor") # 'with conn' must not close it
+        self.assertIs(_get_db_connection(TEST_DB_PATH), conn)
+
+        close_connections()
+        new_conn = _get_db_connection(TEST_DB_PATH)
+        self.assertIsNot(new_conn, conn)
+        self.assertIsNotNone(get_actor_id_by_name_or_alias(TEST_DB_PATH, "Reused Connection Actor"))
+
+    def test_connections_belong_to_their_thread(self):
+        def open_in_thread():
+            thread_conns.append(_get_db_connection(TEST_DB_PATH))
+            thread_caches.append(weakref.ref(actor_management._thread_state.connections))
+
+        thread_conns, thread_caches = [], []
+        for _ in range(2): # Sequential threads may get the same thread ident
+            worker = threading.Thread(target=open_in_thread)
+            worker.start()
+            worker.join()
+        self.assertIsNot(thread_conns[0], thread_conns[1])
+        self.assertIsNot(_get_db_connection(TEST_DB_PATH), thread_conns[0])
+        self.assertEqual(len(thread_caches), 2)
+        self.assertTrue(all(cache() is None for cache in thread_caches)) # Released when each thread exited
+
 if __name__ == '__main__':
     unittest.main()
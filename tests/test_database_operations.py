@@ -0,0 +1,377 @@
+import unittest
+import sys
+import os
+import sqlite3
+import threading
+import weakref
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend import database_operations
+from backend.database_operations import update_video_record, bulk_update_video_records, refresh_actor_cache, close_all, _get_writer_connection, _write_transaction
+
+# Define path for the test database
+TEST_DB_DIR = os.path.dirname(os.path.abspath(__file__))
+TEST_DB_PATH = os.path.join(TEST_DB_DIR, 'test_videos.db')
+
+class TestDatabaseOperations(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the schema once for all tests in this class."""
+        os.makedirs(TEST_DB_DIR, exist_ok=True)
+        if os.path.exists(TEST_DB_PATH):
+            os.remove(TEST_DB_PATH)
+
+        conn = None
+        try:
+            conn = sqlite3.connect(TEST_DB_PATH)
+            cursor = conn.cursor()
+            # Replicating schema from database_setup.py
+            cursor.execute("""CREATE TABLE IF NOT EXISTS videos (
+                                id INTEGER PRIMARY KEY AUTOINCREMENT, code TEXT, title TEXT,
+                                publisher TEXT, duration_seconds INTEGER, filepath TEXT UNIQUE,
+                                standardized_filename TEXT);""")
+            cursor.execute("""CREATE TABLE IF NOT EXISTS actors (
+                                id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL);""")
+            cursor.execute("""CREATE TABLE IF NOT EXISTS video_actors (
+                                video_id INTEGER, actor_id INTEGER, PRIMARY KEY (video_id, actor_id),
+                                FOREIGN KEY (video_id) REFERENCES videos (id) ON DELETE CASCADE,
+                                FOREIGN KEY (actor_id) REFERENCES actors (id) ON DELETE CASCADE);""")
+            cursor.execute("""CREATE TABLE IF NOT EXISTS actor_aliases (
+                                id INTEGER PRIMARY KEY AUTOINCREMENT, alias_name TEXT UNIQUE NOT NULL,
+                                actor_id INTEGER, FOREIGN KEY (actor_id) REFERENCES actors (id) ON DELETE CASCADE);""")
+            conn.commit()
+        finally:
+            if conn:
+                conn.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the test database file (and its WAL side files) after all tests in this class."""
+        close_all()
+        for path in (TEST_DB_PATH, TEST_DB_PATH + "-wal", TEST_DB_PATH + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def setUp(self):
+        """Clear data and seed two actors (IDs 1 and 2) before each test method."""
+        conn = None
+        try:
+            conn = sqlite3.connect(TEST_DB_PATH)
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM video_actors;")
+            cursor.execute("DELETE FROM videos;")
+            cursor.execute("DELETE FROM actor_aliases;")
+            cursor.execute("DELETE FROM actors;")
+            cursor.executemany("INSERT INTO actors (id, name) VALUES (?, ?)", [(1, "John Doe"), (2, "Jane Smith")])
+            conn.commit()
+        finally:
+            if conn:
+                conn.close()
+
+    def _fetch_video(self, filepath):
+        conn = sqlite3.connect(TEST_DB_PATH)
+        try:
+            return conn.execute("SELECT id, code, title, publisher, duration_seconds, standardized_filename "
+                                "FROM videos WHERE filepath = ?", (filepath,)).fetchone()
+        finally:
+            conn.close()
+
+    def _fetch_actor_ids(self, video_id):
+        conn = sqlite3.connect(TEST_DB_PATH)
+        try:
+            rows = conn.execute("SELECT actor_id FROM video_actors WHERE video_id = ?", (video_id,)).fetchall()
+            return sorted(row[0] for row in rows)
+        finally:
+            conn.close()
+
+    def test_insert_new_video(self):
+        update_video_record(TEST_DB_PATH, "/videos/new.mp4", "NEW-001", "New Title", "New Publisher", 120,
+                            "[NEW-001] New Title - John Doe.mp4", [{'id': 1, 'canonical_name': 'John Doe'}])
+        row = self._fetch_video("/videos/new.mp4")
+        self.assertIsNotNone(row)
+        self.assertEqual(row[1:], ("NEW-001", "New Title", "New Publisher", 120, "[NEW-001] New Title - John Doe.mp4"))
+        self.assertEqual(self._fetch_actor_ids(row[0]), [1])
+
+    def test_update_existing_video_replaces_actors(self):
+        update_video_record(TEST_DB_PATH, "/videos/upd.mp4", "UPD-001", "Title", "Pub", 100,
+                            "[UPD-001] Title - John Doe.mp4", [{'id': 1, 'canonical_name': 'John Doe'}])
+        video_id = self._fetch_video("/videos/upd.mp4")[0]
+
+        update_video_record(TEST_DB_PATH, "/videos/upd.mp4", "UPD-002", "New Title", "Pub", 101,
+                            "[UPD-002] New Title - Jane Smith.mp4", [{'id': 2, 'canonical_name': 'Jane Smith'}])
+        row = self._fetch_video("/videos/upd.mp4")
+        self.assertEqual(row[0], video_id) # Same row was updated, not re-inserted
+        self.assertEqual(row[1:3], ("UPD-002", "New Title"))
+        self.assertEqual(self._fetch_actor_ids(video_id), [2])
+
+    def test_unchanged_actors_are_not_rewritten(self):
+        actors = [{'id': 1, 'canonical_name': 'John Doe'}, {'id': 2, 'canonical_name': 'Jane Smith'}]
+        update_video_record(TEST_DB_PATH, "/videos/same.mp4", "SAME-001", "Same", "Pub", 10, "[SAME-001] Same.mp4", actors)
+        video_id = self._fetch_video("/videos/same.mp4")[0]
+        conn = sqlite3.connect(TEST_DB_PATH)
+        try:
+            before = conn.execute("SELECT rowid, actor_id FROM video_actors WHERE video_id = ? ORDER BY actor_id",
+                                  (video_id,)).fetchall()
+        finally:
+            conn.close()
+
+        with self.assertLogs('backend.database_operations', level='DEBUG') as logs:
+            update_video_record(TEST_DB_PATH, "/videos/same.mp4", "SAME-001", "Same", "Pub", 10, "[SAME-001] Same.mp4",
+                                list(reversed(actors)))
+        self.assertIn("0 actor links added, 0 removed", logs.output[-1])
+        self.assertTrue(any("unchanged" in line for line in logs.output)) # videos row not rewritten either
+        conn = sqlite3.connect(TEST_DB_PATH)
+        try:
+            after = conn.execute("SELECT rowid, actor_id FROM video_actors WHERE video_id = ? ORDER BY actor_id",
+                                 (video_id,)).fetchall()
+        finally:
+            conn.close()
+        self.assertEqual(before, after)
+
+        # Partial change: drop 1, keep 2
+        update_video_record(TEST_DB_PATH, "/videos/same.mp4", "SAME-001", "Same", "Pub", 10, "[SAME-001] Same.mp4",
+                            [{'id': 2, 'canonical_name': 'Jane Smith'}])
+        self.assertEqual(self._fetch_actor_ids(video_id), [2])
+
+    def test_video_with_no_actors(self):
+        update_video_record(TEST_DB_PATH, "/videos/none.avi", "NA-002", "No Actors", "Solo", 60,
+                            "[NA-002] No Actors.avi", [])
+        row = self._fetch_video("/videos/none.avi")
+        self.assertIsNotNone(row)
+        self.assertEqual(self._fetch_actor_ids(row[0]), [])
+
+    def test_unknown_and_missing_actor_ids_are_skipped(self):
+        actors = [
+            {'id': 1, 'canonical_name': 'John Doe'},
+            {'id': 999, 'canonical_name': 'Ghost Actor'}, # Not in the actors table
+            {'canonical_name': 'No ID Actor'},            # No database ID at all
+            {'id': 2, 'canonical_name': 'Jane Smith'},
+            {'id': 2, 'canonical_name': 'Jane Smith'},    # Duplicate
+        ]
+        update_video_record(TEST_DB_PATH, "/videos/ghost.mkv", "GHOST-003", "Ghost", "Phantom", 90,
+                            "[GHOST-003] Ghost.mkv", actors)
+        row = self._fetch_video("/videos/ghost.mkv")
+        self.assertIsNotNone(row)
+        self.assertEqual(self._fetch_actor_ids(row[0]), [1, 2])
+
+    def test_actor_id_cache_picks_up_new_actors(self):
+        update_video_record(TEST_DB_PATH, "/videos/cache.mp4", "CACHE-001", "Cache", "Pub", 1, "[CACHE-001] Cache.mp4",
+                            [{'id': 1, 'canonical_name': 'John Doe'}]) # Loads the cache with IDs 1 and 2
+        conn = sqlite3.connect(TEST_DB_PATH)
+        try:
+            conn.execute("INSERT INTO actors (id, name) VALUES (3, 'New Actor')")
+            conn.commit()
+        finally:
+            conn.close()
+        update_video_record(TEST_DB_PATH, "/videos/cache.mp4", "CACHE-001", "Cache", "Pub", 1, "[CACHE-001] Cache.mp4",
+                            [{'id': 1, 'canonical_name': 'John Doe'}, {'id': 3, 'canonical_name': 'New Actor'},
+                             {'id': 999, 'canonical_name': 'Ghost Actor'}])
+        video_id = self._fetch_video("/videos/cache.mp4")[0]
+        self.assertEqual(self._fetch_actor_ids(video_id), [1, 3])
+
+        refresh_actor_cache(TEST_DB_PATH)
+        update_video_record(TEST_DB_PATH, "/videos/cache.mp4", "CACHE-001", "Cache", "Pub", 1, "[CACHE-001] Cache.mp4",
+                            [{'id': 3, 'canonical_name': 'New Actor'}])
+        self.assertEqual(self._fetch_actor_ids(video_id), [3])
+
+    def test_actor_deleted_after_caching_is_skipped(self):
+        update_video_record(TEST_DB_PATH, "/videos/stale.mp4", "STALE-001", "Stale", "Pub", 1, "[STALE-001] Stale.mp4",
+                            [{'id': 1, 'canonical_name': 'John Doe'}]) # Caches IDs 1 and 2
+        conn = sqlite3.connect(TEST_DB_PATH)
+        try:
+            conn.execute("DELETE FROM actors WHERE id = 2")
+            conn.commit()
+        finally:
+            conn.close()
+        with self.assertLogs('backend.database_operations', level='WARNING') as logs:
+            update_video_record(TEST_DB_PATH, "/videos/stale.mp4", "STALE-001", "Stale", "Pub", 1, "[STALE-001] Stale.mp4",
+                                [{'id': 1, 'canonical_name': 'John Doe'}, {'id': 2, 'canonical_name': 'Jane Smith'}])
+        self.assertIn("deleted since cached", logs.output[0])
+        self.assertIn("[2]", logs.output[0])
+        video_id = self._fetch_video("/videos/stale.mp4")[0]
+        self.assertEqual(self._fetch_actor_ids(video_id), [1])
+
+    def test_failed_update_is_rolled_back(self):
+        # None is not an actor dict; the error happens after the video upsert, inside the transaction
+        update_video_record(TEST_DB_PATH, "/videos/broken.mp4", "BRK-001", "Broken", "Pub", 5,
+                            "[BRK-001] Broken.mp4", [None])
+        self.assertIsNone(self._fetch_video("/videos/broken.mp4"))
+
+        # The cached writer connection is still usable afterwards
+        update_video_record(TEST_DB_PATH, "/videos/broken.mp4", "BRK-001", "Fixed", "Pub", 5,
+                            "[BRK-001] Fixed.mp4", [])
+        self.assertEqual(self._fetch_video("/videos/broken.mp4")[2], "Fixed")
+
+    def test_foreign_key_violation_fails_at_commit_and_rolls_back(self):
+        with self.assertRaises(sqlite3.IntegrityError):
+            with _write_transaction(TEST_DB_PATH) as cursor:
+                cursor.execute("INSERT INTO videos (filepath, title) VALUES (?, ?)", ("/videos/fk.mp4", "FK"))
+                cursor.execute("INSERT INTO video_actors (video_id, actor_id) VALUES (?, ?)", (cursor.lastrowid, 999))
+        self.assertIsNone(self._fetch_video("/videos/fk.mp4"))
+
+        # The writer connection is usable again afterwards
+        update_video_record(TEST_DB_PATH, "/videos/fk.mp4", "FK-001", "FK", "Pub", 1, "[FK-001] FK.mp4", [])
+        self.assertIsNotNone(self._fetch_video("/videos/fk.mp4"))
+
+    def test_nested_updates_share_one_transaction(self):
+        with _write_transaction(TEST_DB_PATH):
+            update_video_record(TEST_DB_PATH, "/videos/outer_a.mp4", "OUT-001", "A", "Pub", 1, "[OUT-001] A.mp4",
+                                [{'id': 1, 'canonical_name': 'John Doe'}])
+            update_video_record(TEST_DB_PATH, "/videos/outer_bad.mp4", "OUT-002", "Bad", "Pub", 1, "[OUT-002] Bad.mp4",
+                                [None]) # Fails; only its savepoint is rolled back
+            update_video_record(TEST_DB_PATH, "/videos/outer_b.mp4", "OUT-003", "B", "Pub", 1, "[OUT-003] B.mp4", [])
+            self.assertIsNone(self._fetch_video("/videos/outer_a.mp4")) # Not committed yet
+        self.assertIsNotNone(self._fetch_video("/videos/outer_a.mp4"))
+        self.assertIsNone(self._fetch_video("/videos/outer_bad.mp4"))
+        self.assertIsNotNone(self._fetch_video("/videos/outer_b.mp4"))
+
+        with self.assertRaises(RuntimeError):
+            with _write_transaction(TEST_DB_PATH):
+                update_video_record(TEST_DB_PATH, "/videos/outer_c.mp4", "OUT-004", "C", "Pub", 1, "[OUT-004] C.mp4", [])
+                raise RuntimeError("abort batch")
+        self.assertIsNone(self._fetch_video("/videos/outer_c.mp4"))
+
+    def test_bulk_update_video_records(self):
+        update_video_record(TEST_DB_PATH, "/videos/bulk_existing.mp4", "OLD-001", "Old", "Pub", 10,
+                            "[OLD-001] Old - John Doe.mp4", [{'id': 1, 'canonical_name': 'John Doe'}])
+        existing_id = self._fetch_video("/videos/bulk_existing.mp4")[0]
+
+        records = [
+            {'filepath': "/videos/bulk_existing.mp4", 'code': "NEW-001", 'title': "New", 'publisher': "Pub",
+             'duration_seconds': 11, 'standardized_filename': "[NEW-001] New - Jane Smith.mp4",
+             'actors': [{'id': 2, 'canonical_name': 'Jane Smith'}]},
+            {'filepath': "/videos/bulk_a.mp4", 'code': "A-001", 'title': "A", 'publisher': None,
+             'duration_seconds': None, 'standardized_filename': "[A-001] A.mp4",
+             'actors': [{'id': 1, 'canonical_name': 'John Doe'}, {'id': 999, 'canonical_name': 'Ghost'}]},
+            {'filepath': "/videos/bulk_b.mp4", 'code': "B-001", 'title': "B first", 'publisher': None,
+             'duration_seconds': None, 'standardized_filename': "[B-001] B.mp4",
+             'actors': [{'id': 1, 'canonical_name': 'John Doe'}]},
+            {'filepath': "/videos/bulk_b.mp4", 'code': "B-001", 'title': "B second", 'publisher': None,
+             'duration_seconds': None, 'standardized_filename': "[B-001] B.mp4",
+             'actors': [{'id': 2, 'canonical_name': 'Jane Smith'}]}, # Last record for a filepath wins
+        ]
+        self.assertEqual(bulk_update_video_records(TEST_DB_PATH, records), 3)
+
+        existing = self._fetch_video("/videos/bulk_existing.mp4")
+        self.assertEqual(existing[0], existing_id)
+        self.assertEqual(existing[1:3], ("NEW-001", "New"))
+        self.assertEqual(self._fetch_actor_ids(existing_id), [2])
+
+        video_a = self._fetch_video("/videos/bulk_a.mp4")
+        self.assertEqual(self._fetch_actor_ids(video_a[0]), [1])
+
+        video_b = self._fetch_video("/videos/bulk_b.mp4")
+        self.assertEqual(video_b[2], "B second")
+        self.assertEqual(self._fetch_actor_ids(video_b[0]), [2])
+
+        self.assertEqual(bulk_update_video_records(TEST_DB_PATH, []), 0)
+
+        # Re-running the same batch keeps the existing link rows in place
+        conn = sqlite3.connect(TEST_DB_PATH)
+        try:
+            links_before = conn.execute("SELECT rowid, video_id, actor_id FROM video_actors ORDER BY rowid").fetchall()
+            with self.assertLogs('backend.database_operations', level='INFO') as logs:
+                bulk_update_video_records(TEST_DB_PATH, records)
+            links_after = conn.execute("SELECT rowid, video_id, actor_id FROM video_actors ORDER BY rowid").fetchall()
+        finally:
+            conn.close()
+        self.assertEqual(links_before, links_after)
+        self.assertIn("0 actor links added, 0 removed", logs.output[-1])
+
+    def test_writer_switches_database_to_wal(self):
+        update_video_record(TEST_DB_PATH, "/videos/wal.mp4", "WAL-001", "Wal", "Pub", 10, "[WAL-001] Wal.mp4", [])
+        conn = sqlite3.connect(TEST_DB_PATH)
+        try:
+            self.assertEqual(conn.execute("PRAGMA journal_mode;").fetchone()[0], "wal")
+        finally:
+            conn.close()
+
+    def test_missing_filepath_unique_index_is_created(self):
+        legacy_db_path = os.path.join(TEST_DB_DIR, 'test_videos_legacy.db')
+        if os.path.exists(legacy_db_path):
+            os.remove(legacy_db_path)
+        conn = sqlite3.connect(legacy_db_path)
+        try:
+            # Same tables, but filepath without UNIQUE
+            conn.execute("""CREATE TABLE videos (
+                                id INTEGER PRIMARY KEY AUTOINCREMENT, code TEXT, title TEXT,
+                                publisher TEXT, duration_seconds INTEGER, filepath TEXT,
+                                standardized_filename TEXT);""")
+            conn.execute("CREATE TABLE actors (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL);")
+            conn.execute("""CREATE TABLE video_actors (video_id INTEGER, actor_id INTEGER,
+                                PRIMARY KEY (video_id, actor_id));""")
+            conn.commit()
+        finally:
+            conn.close()
+
+        try:
+            update_video_record(legacy_db_path, "/videos/legacy.mp4", "LEG-001", "First", "Pub", 1, "[LEG-001] First.mp4", [])
+            update_video_record(legacy_db_path, "/videos/legacy.mp4", "LEG-001", "Second", "Pub", 1, "[LEG-001] Second.mp4", [])
+            conn = sqlite3.connect(legacy_db_path)
+            try:
+                rows = conn.execute("SELECT title FROM videos").fetchall()
+            finally:
+                conn.close()
+            self.assertEqual(rows, [("Second",)])
+        finally:
+            close_all()
+            for path in (legacy_db_path, legacy_db_path + "-wal", legacy_db_path + "-shm"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def test_duplicate_filepaths_fail_writes_with_one_clear_error(self):
+        legacy_db_path = os.path.join(TEST_DB_DIR, 'test_videos_duplicates.db')
+        if os.path.exists(legacy_db_path):
+            os.remove(legacy_db_path)
+        conn = sqlite3.connect(legacy_db_path)
+        try:
+            conn.execute("""CREATE TABLE videos (
+                                id INTEGER PRIMARY KEY AUTOINCREMENT, code TEXT, title TEXT,
+                                publisher TEXT, duration_seconds INTEGER, filepath TEXT,
+                                standardized_filename TEXT);""")
+            conn.executemany("INSERT INTO videos (filepath, title) VALUES (?, ?)",
+                             [("/videos/dup.mp4", "One"), ("/videos/dup.mp4", "Two")])
+            conn.commit()
+        finally:
+            conn.close()
+
+        try:
+            with self.assertLogs('backend.database_operations', level='ERROR') as logs:
+                for _ in range(2): # Fails without raising, and is reported once
+                    update_video_record(legacy_db_path, "/videos/new.mp4", "DUP-001", "New", "Pub", 1, "[DUP-001] New.mp4", [])
+            self.assertEqual(sum("duplicate videos.filepath" in line for line in logs.output), 1)
+            self.assertNotIn(legacy_db_path, database_operations._thread_state.writers.by_path) # Not cached
+        finally:
+            close_all()
+            for path in (legacy_db_path, legacy_db_path + "-wal", legacy_db_path + "-shm"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def test_writer_connection_is_reused(self):
+        self.assertIs(_get_writer_connection(TEST_DB_PATH), _get_writer_connection(TEST_DB_PATH))
+
+    def test_writer_connections_belong_to_their_thread(self):
+        def write_in_thread(i):
+            update_video_record(TEST_DB_PATH, f"/videos/thread_{i}.mp4", f"THR-{i:03d}", "Thread", "Pub", i,
+                                f"[THR-{i:03d}] Thread.mp4", [])
+            conn = _get_writer_connection(TEST_DB_PATH)
+            self.assertIsNot(conn, main_conn)
+            thread_conns.append(conn)
+            thread_caches.append(weakref.ref(database_operations._thread_state.writers))
+
+        main_conn = _get_writer_connection(TEST_DB_PATH)
+        thread_conns, thread_caches = [], []
+        for i in range(20): # Sequential threads, so thread idents get reused
+            worker = threading.Thread(target=write_in_thread, args=(i,))
+            worker.start()
+            worker.join()
+        self.assertEqual(len(thread_caches), 20)
+        self.assertEqual(len({id(conn) for conn in thread_conns}), 20) # No thread inherited another's connection
+        self.assertTrue(all(cache() is None for cache in thread_caches)) # Released when each thread exited
+        self.assertEqual(self._fetch_video("/videos/thread_19.mp4")[1], "THR-019")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,7 @@ import os
 # Add project root to sys.path to allow importing from backend and ai_models
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from backend.filename_parser import parse_filename
+from backend.filename_parser import parse_filename, parse_filenames, ParseResult, _is_episode_code
 
 class TestFilenameParser(unittest.TestCase):
 
@@ -163,5 +163,64 @@ class TestFilenameParser(unittest.TestCase):
         self.assertEqual(result['title'], "CODEISNOTREAL Title")
         self.assertListEqual(result['actors'], ["Actor"])
 
+    def test_code_removal_only_removes_the_matched_occurrence(self):
+        result = parse_filename("ABC-12 Making of ABC-123.mp4")
+        self.assertEqual(result['code'], "ABC-12")
+        self.assertEqual(result['title'], "Making of ABC-123") # Not "Making of 3"
+
+    def test_duplicate_actors_keep_first_seen_order(self):
+        result = parse_filename("Title - Actor B, Actor A, Actor B.mp4")
+        self.assertListEqual(result['actors'], ["Actor B", "Actor A"])
+
+    def test_cached_results_are_not_shared(self):
+        filename = "[CACHE-001] Cached Title - Actor A, Actor B.mp4"
+        first = parse_filename(filename)
+        first['actors'].append("Mutated")
+        first['title'] = "Mutated"
+        second = parse_filename(filename)
+        self.assertEqual(second['title'], "Cached Title")
+        self.assertListEqual(second['actors'], ["Actor A", "Actor B"])
+
+    def test_plain_title_fast_path(self):
+        result = parse_filename("Just-A-Title.mp4")
+        self.assertIsNone(result['code'])
+        self.assertListEqual(result['actors'], [])
+        self.assertEqual(result['title'], "Just-A-Title")
+        self.assertEqual(parse_filename("....mp4")['title'], "...") # Title cleanup empties it, keep the raw name
+
+    def test_names_without_stem(self):
+        for filename in ("", ".DS_Store", ".mp4"):
+            result = parse_filename(filename)
+            self.assertEqual(result, {"code": None, "actors": [], "title": None, "original_filename": filename})
+        parse_filename(".DS_Store")['actors'].append("Mutated")
+        self.assertListEqual(parse_filename(".DS_Store")['actors'], [])
+
+    def test_is_episode_code(self):
+        for code in ("Series_ep01", "Show-Part2", "Saga.Vol_3", "Story-chapter-12", "Clip_SC5", "Show_Episode7"):
+            self.assertTrue(_is_episode_code(code), code)
+        for code in ("ABC-123", "ep01", "Series_Step1", "Series_ep", "Show_part2x", "EPISODE-1"):
+            self.assertFalse(_is_episode_code(code), code)
+
+    def test_suffix_actor_stop_words_and_initials(self):
+        self.assertListEqual(parse_filename("My_Movie_J_Smith.mp4")['actors'], ["J", "Smith"]) # Initial kept
+        result = parse_filename("My Movie Of.mp4") # Stop-word is not an actor
+        self.assertListEqual(result['actors'], [])
+        self.assertEqual(result['title'], "My Movie Of")
+
+    def test_parse_filenames_batch(self):
+        filenames = ["[ABC-123] Title - Actor A.mp4", ".DS_Store", "Plain Title.mkv", "[ABC-123] Title - Actor A.mp4"]
+        results = parse_filenames(iter(filenames))
+        self.assertListEqual(results, [parse_filename(name) for name in filenames])
+        results[0]['actors'].append("Mutated") # Repeated names still get their own dicts
+        self.assertListEqual(results[3]['actors'], ["Actor A"])
+        self.assertListEqual(parse_filenames([]), [])
+
+    def test_parse_result_to_dict(self):
+        result = ParseResult("ABC-123", ("Actor A",), "Title", "[ABC-123] Title - Actor A.mp4")
+        as_dict = result.to_dict()
+        self.assertEqual(as_dict, parse_filename("[ABC-123] Title - Actor A.mp4"))
+        as_dict['actors'].append("Mutated")
+        self.assertListEqual(result.to_dict()['actors'], ["Actor A"])
+
 if __name__ == '__main__':
     unittest.main()
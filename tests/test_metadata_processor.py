@@ -0,0 +1,201 @@
+import unittest
+import sys
+import os
+import shutil
+import sqlite3
+from unittest import mock
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend import metadata_processor
+from backend.metadata_processor import process_video_files, sanitize_filename_part, generate_standardized_filename
+from backend.database_operations import close_all
+from backend.actor_management import close_connections
+
+# Define paths for the test database and dummy video files
+TEST_DB_DIR = os.path.dirname(os.path.abspath(__file__))
+TEST_DB_PATH = os.path.join(TEST_DB_DIR, 'test_metadata.db')
+TEST_VIDEOS_DIR = os.path.join(TEST_DB_DIR, 'test_metadata_videos')
+
+class TestMetadataProcessor(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the schema and the dummy video directory once for all tests in this class."""
+        os.makedirs(TEST_VIDEOS_DIR, exist_ok=True)
+        if os.path.exists(TEST_DB_PATH):
+            os.remove(TEST_DB_PATH)
+
+        conn = None
+        try:
+            conn = sqlite3.connect(TEST_DB_PATH)
+            cursor = conn.cursor()
+            # Replicating schema from database_setup.py
+            cursor.execute("""CREATE TABLE IF NOT EXISTS videos (
+                                id INTEGER PRIMARY KEY AUTOINCREMENT, code TEXT, title TEXT,
+                                publisher TEXT, duration_seconds INTEGER, filepath TEXT UNIQUE,
+                                standardized_filename TEXT);""")
+            cursor.execute("""CREATE TABLE IF NOT EXISTS actors (
+                                id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL);""")
+            cursor.execute("""CREATE TABLE IF NOT EXISTS video_actors (
+                                video_id INTEGER, actor_id INTEGER, PRIMARY KEY (video_id, actor_id),
+                                FOREIGN KEY (video_id) REFERENCES videos (id) ON DELETE CASCADE,
+                                FOREIGN KEY (actor_id) REFERENCES actors (id) ON DELETE CASCADE);""")
+            cursor.execute("""CREATE TABLE IF NOT EXISTS actor_aliases (
+                                id INTEGER PRIMARY KEY AUTOINCREMENT, alias_name TEXT UNIQUE NOT NULL,
+                                actor_id INTEGER, FOREIGN KEY (actor_id) REFERENCES actors (id) ON DELETE CASCADE);""")
+            cursor.executemany("INSERT INTO actors (id, name) VALUES (?, ?)", [(1, "John Doe"), (2, "Jane Smith")])
+            cursor.execute("INSERT INTO actor_aliases (alias_name, actor_id) VALUES (?, ?)", ("Johnny D", 1))
+            conn.commit()
+        finally:
+            if conn:
+                conn.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the test database (and its WAL side files) and the dummy videos."""
+        close_all()
+        close_connections()
+        for path in (TEST_DB_PATH, TEST_DB_PATH + "-wal", TEST_DB_PATH + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(TEST_VIDEOS_DIR, ignore_errors=True)
+
+    def _make_video(self, name):
+        filepath = os.path.join(TEST_VIDEOS_DIR, name)
+        with open(filepath, "w") as f:
+            f.write("dummy")
+        return filepath
+
+    def _fetch_videos(self):
+        close_all() # Checkpoint the WAL so a fresh connection sees every write
+        conn = sqlite3.connect(TEST_DB_PATH)
+        try:
+            return {row[0]: row[1:] for row in conn.execute(
+                "SELECT v.filepath, v.code, group_concat(va.actor_id) FROM videos v "
+                "LEFT JOIN video_actors va ON va.video_id = v.id GROUP BY v.id")}
+        finally:
+            conn.close()
+
+    def test_process_video_files_keeps_input_order(self):
+        paths = [
+            self._make_video("[XYZ-789] My Great Movie - John Doe.mp4"),
+            os.path.join(TEST_VIDEOS_DIR, "missing.mp4"),
+            self._make_video("[ABC-001] Another Movie - Johnny D & Jane Smith.mkv"),
+        ]
+        results = process_video_files(paths, TEST_DB_PATH, max_workers=3)
+
+        self.assertEqual(len(results), 3)
+        self.assertIsNone(results[1]) # Missing file
+        self.assertEqual(results[0]["original_filepath"], paths[0])
+        self.assertEqual(results[2]["original_filepath"], paths[2])
+        self.assertEqual(results[0]["consolidated_metadata"]["code"], "XYZ-789")
+        self.assertEqual(sorted(actor["id"] for actor in results[2]["consolidated_metadata"]["actors"]), [1, 2])
+
+        videos = self._fetch_videos()
+        self.assertEqual(videos[paths[0]], ("XYZ-789", "1"))
+        self.assertEqual(videos[paths[2]][0], "ABC-001")
+        self.assertEqual(sorted(videos[paths[2]][1].split(",")), ["1", "2"])
+        self.assertNotIn(paths[1], videos)
+
+    def test_process_video_files_isolates_failures(self):
+        paths = [self._make_video(f"[ERR-00{i}] Error Movie {i} - Jane Smith.mp4") for i in range(1, 4)]
+        compute = metadata_processor._compute_video_metadata
+
+        def fail_for_second(video_filepath, db_path):
+            if video_filepath == paths[1]:
+                raise RuntimeError("analysis crashed")
+            return compute(video_filepath, db_path)
+
+        with mock.patch.object(metadata_processor, "_compute_video_metadata", side_effect=fail_for_second):
+            results = process_video_files(paths, TEST_DB_PATH, max_workers=0) # Clamped to one worker
+        self.assertIsNone(results[1])
+        self.assertEqual([results[0]["original_filepath"], results[2]["original_filepath"]], [paths[0], paths[2]])
+
+        videos = self._fetch_videos()
+        self.assertEqual(videos[paths[0]][0], "ERR-001")
+        self.assertEqual(videos[paths[2]][0], "ERR-003")
+        self.assertNotIn(paths[1], videos)
+
+    def test_process_video_files_writes_pending_results_when_interrupted(self):
+        paths = [self._make_video(f"[INT-00{i}] Interrupted Movie {i}.mp4") for i in range(1, 4)]
+        compute = metadata_processor._compute_video_metadata
+
+        def interrupt_at_last(video_filepath, db_path):
+            if video_filepath == paths[2]:
+                raise KeyboardInterrupt # Not an Exception, so it ends the run
+            return compute(video_filepath, db_path)
+
+        with mock.patch.object(metadata_processor, "_compute_video_metadata", side_effect=interrupt_at_last):
+            with self.assertRaises(KeyboardInterrupt):
+                process_video_files(paths, TEST_DB_PATH, max_workers=1)
+        videos = self._fetch_videos()
+        self.assertEqual(videos[paths[0]][0], "INT-001") # Computed before the interrupt, still written
+        self.assertEqual(videos[paths[1]][0], "INT-002")
+        self.assertNotIn(paths[2], videos)
+
+    def test_process_video_files_writes_in_batches(self):
+        paths = [self._make_video(f"[BAT-00{i}] Batch Movie {i} - Jane Smith.mp4") for i in range(1, 4)]
+        with mock.patch.object(metadata_processor, "BULK_WRITE_BATCH_SIZE", 2), \
+             mock.patch.object(metadata_processor, "bulk_update_video_records",
+                               wraps=metadata_processor.bulk_update_video_records) as bulk_write:
+            process_video_files(paths, TEST_DB_PATH)
+        self.assertEqual([len(call.args[1]) for call in bulk_write.call_args_list], [2, 1])
+
+        videos = self._fetch_videos()
+        for i, path in enumerate(paths, 1):
+            self.assertEqual(videos[path], (f"BAT-00{i}", "2"))
+
+    def test_actor_names_resolved_in_one_lookup(self):
+        # No code in the name, so content analysis runs and adds OCR names to the filename's
+        path = self._make_video("coolstudio clip - John Doe.mp4")
+        with mock.patch.object(metadata_processor, "get_actor_ids_by_names_or_aliases",
+                               wraps=metadata_processor.get_actor_ids_by_names_or_aliases) as lookup:
+            results = process_video_files([path], TEST_DB_PATH)
+        self.assertEqual(lookup.call_count, 1)
+        self.assertTrue(results[0]["content_analysis_triggered"])
+        self.assertEqual([actor["id"] for actor in results[0]["actors_from_filename_lookup"]], [1])
+        self.assertEqual([actor["source"] for actor in results[0]["actors_from_content_lookup"]],
+                         ["ocr_on_screen", "ocr_on_screen", "audio_mentioned", "audio_mentioned"])
+        self.assertEqual(results[0]["consolidated_metadata"]["actors"], [{"id": 1, "canonical_name": "John Doe"}])
+
+    def test_process_video_files_failed_batch_is_not_reported_as_processed(self):
+        paths = [self._make_video(f"[FAIL-00{i}] Failed Batch {i}.mp4") for i in range(1, 4)]
+        with mock.patch.object(metadata_processor, "BULK_WRITE_BATCH_SIZE", 2), \
+             mock.patch.object(metadata_processor, "bulk_update_video_records", side_effect=[0, 1]):
+            results = process_video_files(paths, TEST_DB_PATH, max_workers=1)
+        self.assertEqual(results[:2], [None, None]) # First batch rolled back
+        self.assertEqual(results[2]["consolidated_metadata"]["code"], "FAIL-003")
+
+    def test_sanitize_filename_part(self):
+        self.assertEqual(sanitize_filename_part('A/B:C*D?"E<F>G|H\\I'), "A_B_C_D__E_F_G_H_I")
+        self.assertEqual(sanitize_filename_part("  Title \t with\n  spaces  "), "Title with spaces")
+        self.assertEqual(sanitize_filename_part(""), "")
+        self.assertEqual(sanitize_filename_part(None), "")
+        hits = sanitize_filename_part.cache_info().hits
+        self.assertEqual(sanitize_filename_part("  Title \t with\n  spaces  "), "Title with spaces")
+        self.assertEqual(sanitize_filename_part.cache_info().hits, hits + 1) # Repeated parts come from the cache
+
+    def test_generate_standardized_filename(self):
+        actors = [{"id": 2, "canonical_name": "Jane Smith"}, {"id": 1, "canonical_name": "John Doe"}]
+        cases = [
+            ({"code": "XYZ-789", "title": "My Movie", "actors": actors}, "[XYZ-789] My Movie - Jane Smith, John Doe.mp4"),
+            ({"code": "XYZ-789", "title": "My Movie", "actors": []}, "[XYZ-789] My Movie.mp4"),
+            ({"title": "My Movie", "actors": actors}, "My Movie - Jane Smith, John Doe.mp4"),
+            ({"publisher": "Studio: X", "title": "My Movie"}, "[Studio_ X] My Movie.mp4"),
+            ({"title": "My Movie"}, "My Movie.mp4"),
+            ({"code": "XYZ-789", "actors": actors}, "[XYZ-789] Unknown Title - Jane Smith, John Doe.mp4"),
+            ({}, "Unknown Title.mp4"),
+            ({"code": "XYZ-789", "title": " \t "}, "[XYZ-789] Unknown Title.mp4"), # Title sanitizes to nothing
+        ]
+        for metadata, expected in cases:
+            self.assertEqual(generate_standardized_filename(metadata, ".mp4"), expected)
+        long_name = generate_standardized_filename({"title": "T" * 300}, ".mkv")
+        self.assertEqual(long_name, "T" * 200 + ".mkv")
+
+    def test_process_video_files_empty(self):
+        self.assertListEqual(process_video_files([], TEST_DB_PATH), [])
+
+if __name__ == '__main__':
+    unittest.main()